@@ -4,13 +4,20 @@ API FastAPI para validação de placas no sistema de cancela.
 Fornece endpoints para verificar placas autorizadas e gerenciar o sistema.
 """
 
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel, Field
-from typing import Optional, List, Dict
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
+from typing import Annotated, Iterator, Literal, Optional, List, Dict
+from contextlib import asynccontextmanager
+import asyncio
+import itertools
+import msgspec
+import orjson
+from cachetools import TTLCache
 import sys
 import os
+import time
 from datetime import datetime
 
 # Adiciona o diretório pai ao path para importar o módulo database
@@ -18,13 +25,100 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from database.db_manager import DatabaseManager
 
+# Fila de logs de acesso: /validar-placa apenas enfileira e um flusher em
+# background grava em lote (executemany) a cada LOG_FLUSH_INTERVAL segundos
+LOG_FLUSH_INTERVAL = 0.05
+LOG_BATCH_SIZE = 500
+_log_queue: asyncio.Queue = asyncio.Queue()
+
+# Ids de log gerados antes de enfileirar, para que /validar-placa possa devolvê-los.
+# Formato snowflake em 53 bits (exato num Number do JavaScript do dashboard): milissegundos
+# desde LOG_ID_EPOCH_MS, 4 bits do PID do worker (PIDs de workers irmãos são consecutivos)
+# e 8 bits de sequência. Crescem com o tempo, então ORDER BY id continua cronológico e
+# ficam acima dos ids já gerados pelo AUTOINCREMENT.
+LOG_ID_EPOCH_MS = 1_704_067_200_000  # 2024-01-01T00:00:00Z
+_LOG_ID_WORKER = os.getpid() & 0xF
+_log_id_estado = [0, 0]  # [último_ms, sequência]; só acessado no event loop
+
+
+def _proximo_log_id() -> int:
+    """Gera o id do próximo log de acesso deste worker."""
+    ms = max(int(time.time() * 1000) - LOG_ID_EPOCH_MS, _log_id_estado[0])
+    if ms == _log_id_estado[0]:
+        seq = (_log_id_estado[1] + 1) & 0xFF
+        if seq == 0:
+            ms += 1  # Sequência esgotada neste milissegundo: avança para o próximo
+    else:
+        seq = 0
+    _log_id_estado[:] = [ms, seq]
+    return (ms << 12) | (_LOG_ID_WORKER << 8) | seq
+
+
+def _drain_log_queue() -> List[tuple]:
+    """Retira da fila até LOG_BATCH_SIZE registros sem bloquear."""
+    rows = []
+    while len(rows) < LOG_BATCH_SIZE and not _log_queue.empty():
+        rows.append(_log_queue.get_nowait())
+    return rows
+
+
+async def _log_flusher():
+    """Grava os logs enfileirados em lote enquanto a aplicação estiver ativa."""
+    while True:
+        rows = [await _log_queue.get()]
+        try:
+            await asyncio.sleep(LOG_FLUSH_INTERVAL)
+        finally:
+            # Também grava o lote corrente se a tarefa for cancelada no desligamento
+            rows += _drain_log_queue()
+            try:
+                await run_in_threadpool(db_manager.registrar_logs_acesso, rows)
+            except Exception as e:
+                print(f"Erro ao gravar {len(rows)} logs de acesso: {e}")
+
+
+# Intervalo (s) entre checkpoints do WAL (DatabaseManager.checkpoint); sem eles, com
+# leitores sempre ativos, o WAL cresce e as leituras ficam mais lentas
+WAL_CHECKPOINT_INTERVAL = 300
+
+
+async def _wal_checkpointer():
+    """Faz o checkpoint do WAL periodicamente enquanto a aplicação estiver ativa."""
+    while True:
+        await asyncio.sleep(WAL_CHECKPOINT_INTERVAL)
+        try:
+            await run_in_threadpool(db_manager.checkpoint)
+        except Exception as e:
+            print(f"Erro no checkpoint do WAL: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Carrega o índice de placas em memória, inicia as tarefas de background
+    e grava o que restar na fila de logs ao desligar.
+    """
+    await _carregar_placas()
+    tarefas = [asyncio.create_task(_log_flusher()), asyncio.create_task(_placas_refresher()),
+               asyncio.create_task(_wal_checkpointer())]
+    yield
+    for tarefa in tarefas:
+        tarefa.cancel()
+    await asyncio.gather(*tarefas, return_exceptions=True)
+    while not _log_queue.empty():
+        db_manager.registrar_logs_acesso(_drain_log_queue())
+    db_manager.close()
+
+
 # Inicializa a aplicação FastAPI
 app = FastAPI(
     title="Sistema de Cancela - API de Validação de Placas",
     description="API para validação de placas de veículos em sistema de cancela automatizada",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Configuração de CORS para permitir acesso de diferentes origens
@@ -39,16 +133,117 @@ app.add_middleware(
 # Instância global do gerenciador de banco de dados
 db_manager = DatabaseManager()
 
-
-# Modelos Pydantic para validação de dados
-
-class PlacaRequest(BaseModel):
+# Índice em memória de todas as placas cadastradas (placa -> linha do banco), carregado
+# no startup e atualizado pelas rotas de escrita. O banco continua sendo a fonte da verdade:
+# a cada PLACAS_POLL_INTERVAL segundos o PRAGMA data_version (O(1)) é consultado e o índice é
+# recarregado assim que as placas mudam, seja por outro worker ou pelo dashboard (outro processo).
+PLACAS_POLL_INTERVAL = 1.0
+_placas: Dict[str, Dict] = {}
+
+# Cache (cache-aside) das consultas ao banco para placas fora do índice, por placa normalizada.
+# Só é acessado no event loop, então dispensa lock. Invalidado nas rotas de escrita.
+_placas_cache: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+
+
+def _resultado_placa(dados: Dict) -> Dict:
+    """Monta o resultado no formato de DatabaseManager.verificar_placa_autorizada."""
+    return {'autorizada': dados['status'] == 'AUTORIZADA', 'status': dados['status'], 'dados': dados}
+
+
+async def _carregar_placas():
+    """(Re)carrega o índice de placas a partir do banco."""
+    global _placas
+    rows = await run_in_threadpool(db_manager.listar_todas_as_placas)
+    _placas = {row['placa']: row for row in rows}
+    _placas_cache.clear()
+    # As placas mudaram (aqui, em outro worker ou no dashboard): o total é recontado
+    _invalidar_total_autorizadas()
+
+
+async def _placas_refresher():
+    """Recarrega o índice quando as placas mudam no banco, por qualquer conexão ou processo."""
+    recarregar = False
+    while True:
+        # O gerador é bloqueante (sqlite3 + sleep): cada passo roda no threadpool
+        mudancas = db_manager.observar_mudancas(PLACAS_POLL_INTERVAL)
+        try:
+            if recarregar:
+                # Mudanças feitas enquanto a observação estava interrompida
+                await _carregar_placas()
+                recarregar = False
+            while True:
+                mudou = await run_in_threadpool(next, mudancas, None)
+                if mudou is None:
+                    break
+                if mudou['placas']:
+                    await _carregar_placas()
+        except Exception as e:
+            print(f"Erro ao acompanhar mudanças nas placas: {e}")
+            recarregar = True
+            await asyncio.sleep(PLACAS_POLL_INTERVAL)
+        finally:
+            try:
+                mudancas.close()
+            except ValueError:
+                pass  # Ainda em execução no threadpool (cancelamento); é fechado ao ser coletado
+
+
+async def _atualizar_placa_em_memoria(placa: str):
+    """Relê uma placa do banco após uma escrita e atualiza o índice e o cache."""
+    resultado = await run_in_threadpool(db_manager.verificar_placa_autorizada, placa)
+    _placas_cache.pop(placa, None)
+    if resultado['dados']:
+        _placas[placa] = resultado['dados']
+    else:
+        _placas.pop(placa, None)
+
+# Total de placas autorizadas em cache (None = recalcular); zerado nas rotas de escrita
+# e a cada recarga do índice (_carregar_placas), que capta escritas de outros processos
+_total_autorizadas: Optional[int] = None
+
+
+def _invalidar_total_autorizadas():
+    global _total_autorizadas
+    _total_autorizadas = None
+
+
+# Horário ISO em cache: [segundo_unix, iso]. Evita formatar um datetime por resposta.
+_ts_cache = [0, ""]
+
+
+def now_iso() -> str:
+    """Retorna o horário local em ISO 8601, recalculado no máximo uma vez por segundo."""
+    t = int(time.time())
+    if t != _ts_cache[0]:
+        _ts_cache[:] = [t, datetime.fromtimestamp(t).isoformat()]
+    return _ts_cache[1]
+
+
+# Respostas pré-serializadas (orjson) de "/" e "/estatisticas": [expira_em, payload].
+# As estatísticas mudam na escala de segundos, mas são consultadas com frequência.
+STATS_CACHE_TTL = 1.0
+_root_cache = [0.0, b""]
+_stats_cache = [0.0, b""]
+
+
+# Modelos msgspec para validação de dados (decodificação + validação em C)
+
+Placa = Annotated[str, msgspec.Meta(min_length=7, max_length=8, description="Placa do veículo")]
+StatusPlaca = Literal["AUTORIZADA", "NAO_AUTORIZADA"]
+ConfiancaOCR = Annotated[float, msgspec.Meta(ge=0.0, le=1.0, description="Confiança do OCR (0.0 a 1.0)")]
+
+
+class PlacaRequest(msgspec.Struct):
     """Modelo para requisição de validação de placa."""
-    placa: str = Field(..., min_length=7, max_length=8, description="Placa do veículo")
-    confianca_ocr: Optional[float] = Field(None, ge=0.0, le=1.0, description="Confiança do OCR (0.0 a 1.0)")
+    placa: Placa
+    confianca_ocr: Optional[ConfiancaOCR] = None
 
+    def __post_init__(self):
+        # Normaliza uma única vez; o restante da API usa a placa já em maiúsculas
+        self.placa = self.placa.strip().upper()
 
-class PlacaResponse(BaseModel):
+
+class PlacaResponse(msgspec.Struct):
     """Modelo para resposta de validação de placa."""
     placa: str
     autorizada: bool
@@ -59,18 +254,62 @@ class PlacaResponse(BaseModel):
     log_id: Optional[int] = None
 
 
-class NovaPlacaRequest(BaseModel):
+class NovaPlacaRequest(msgspec.Struct):
     """Modelo para adicionar nova placa."""
-    placa: str = Field(..., min_length=7, max_length=8)
-    status: str = Field(..., pattern="^(AUTORIZADA|NAO_AUTORIZADA)$")
+    placa: Placa
+    status: StatusPlaca
     veiculo_modelo: Optional[str] = None
     veiculo_cor: Optional[str] = None
     cliente_nome: Optional[str] = None
 
+    def __post_init__(self):
+        self.placa = self.placa.strip().upper()
+
 
-class AtualizarStatusRequest(BaseModel):
+class AtualizarStatusRequest(msgspec.Struct):
     """Modelo para atualizar status de placa."""
-    status: str = Field(..., pattern="^(AUTORIZADA|NAO_AUTORIZADA)$")
+    status: StatusPlaca
+
+
+# Decoders/encoder reutilizados entre requisições
+_placa_request_decoder = msgspec.json.Decoder(PlacaRequest)
+_nova_placa_decoder = msgspec.json.Decoder(NovaPlacaRequest)
+_atualizar_status_decoder = msgspec.json.Decoder(AtualizarStatusRequest)
+_json_encoder = msgspec.json.Encoder()
+
+
+async def _decode_body(http_request: Request, decoder: msgspec.json.Decoder):
+    """Decodifica e valida o corpo JSON da requisição; erros viram 422 como no FastAPI."""
+    try:
+        return decoder.decode(await http_request.body())
+    except msgspec.DecodeError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
+
+def _json_schema(model: type) -> dict:
+    """Retorna o JSON schema (sem $ref) de um modelo msgspec."""
+    _, components = msgspec.json.schema_components([model])
+    return components[model.__name__]
+
+
+def _openapi_body(model: type) -> dict:
+    """Gera o requestBody do OpenAPI a partir do schema msgspec do modelo."""
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": _json_schema(model)}}
+        }
+    }
+
+
+def _openapi_response(model: type) -> dict:
+    """Documenta a resposta 200 sem que o FastAPI revalide o objeto retornado."""
+    return {
+        200: {
+            "description": "Successful Response",
+            "content": {"application/json": {"schema": _json_schema(model)}}
+        }
+    }
 
 
 # Endpoints da API
@@ -78,12 +317,15 @@ class AtualizarStatusRequest(BaseModel):
 @app.get("/", tags=["Sistema"])
 async def root():
     """Endpoint raiz da API."""
-    return {
-        "message": "Sistema de Cancela - API de Validação de Placas",
-        "version": "1.0.0",
-        "status": "ativo",
-        "timestamp": datetime.now().isoformat()
-    }
+    now = time.monotonic()
+    if now >= _root_cache[0]:
+        _root_cache[:] = [now + STATS_CACHE_TTL, orjson.dumps({
+            "message": "Sistema de Cancela - API de Validação de Placas",
+            "version": "1.0.0",
+            "status": "ativo",
+            "timestamp": now_iso()
+        })]
+    return Response(content=_root_cache[1], media_type="application/json")
 
 
 @app.get("/health", tags=["Sistema"])
@@ -91,11 +333,11 @@ async def health_check():
     """Endpoint para verificação de saúde da API."""
     try:
         # Testa a conexão com o banco de dados
-        stats = db_manager.obter_estatisticas()
+        stats = await run_in_threadpool(db_manager.obter_estatisticas)
         return {
             "status": "healthy",
             "database": "connected",
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now_iso(),
             "stats": stats
         }
     except Exception as e:
@@ -105,42 +347,68 @@ async def health_check():
         )
 
 
-@app.post("/validar-placa", response_model=PlacaResponse, tags=["Validação"])
-async def validar_placa(request: PlacaRequest):
+@app.post(
+    "/validar-placa",
+    tags=["Validação"],
+    response_model=None,
+    responses=_openapi_response(PlacaResponse),
+    openapi_extra=_openapi_body(PlacaRequest)
+)
+async def validar_placa(http_request: Request):
     """
     Valida uma placa de veículo e determina se a cancela deve ser aberta.
 
     Args:
-        request: Dados da placa a ser validada.
+        http_request: Requisição cujo corpo JSON segue PlacaRequest.
 
     Returns:
         Resposta com o status de autorização e ação da cancela.
     """
+    request = await _decode_body(http_request, _placa_request_decoder)
     try:
-        # Verifica a placa no banco de dados
-        resultado = db_manager.verificar_placa_autorizada(request.placa)
+        # Verifica a placa no índice em memória; só vai ao banco se não estiver lá
+        dados = _placas.get(request.placa)
+        if dados is not None:
+            resultado = _resultado_placa(dados)
+        else:
+            resultado = _placas_cache.get(request.placa)
+            if resultado is None:
+                # O sqlite3 é bloqueante: as consultas rodam no threadpool para não travar o event loop
+                resultado = await run_in_threadpool(db_manager.verificar_placa_autorizada, request.placa)
+                _placas_cache[request.placa] = resultado
+                if resultado['dados']:
+                    # Cadastrada por outro worker desde o último recarregamento
+                    _placas[request.placa] = resultado['dados']
 
         # Determina a ação da cancela
         acao_cancela = "ABERTA" if resultado['autorizada'] else "FECHADA"
 
-        # Registra o log de acesso
-        log_id = db_manager.registrar_log_acesso(
+        # Enfileira o log de acesso; a gravação em lote é feita pelo _log_flusher.
+        # O id é gerado agora (e devolvido na resposta); o horário é capturado como
+        # epoch e só é formatado pelo SQLite na gravação.
+        log_id = _proximo_log_id()
+        await _log_queue.put((
+            log_id,
+            request.placa,
+            resultado['status'],
+            acao_cancela,
+            request.confianca_ocr,
+            f"Validação via API - Confiança OCR: {request.confianca_ocr}",
+            time.time()
+        ))
+
+        # Structs msgspec não revalidam no construtor e a resposta vai direto ao
+        # encoder, sem a validação de response_model do FastAPI
+        resposta = PlacaResponse(
             placa=request.placa,
-            status_validacao=resultado['status'],
-            acao_cancela=acao_cancela,
-            confianca_ocr=request.confianca_ocr,
-            observacoes=f"Validação via API - Confiança OCR: {request.confianca_ocr}"
-        )
-
-        return PlacaResponse(
-            placa=request.placa.upper(),
             autorizada=resultado['autorizada'],
             status=resultado['status'],
             acao_cancela=acao_cancela,
-            timestamp=datetime.now().isoformat(),
+            timestamp=now_iso(),
             dados_veiculo=resultado['dados'],
             log_id=log_id
         )
+        return Response(content=_json_encoder.encode(resposta), media_type="application/json")
 
     except Exception as e:
         raise HTTPException(
@@ -149,13 +417,26 @@ async def validar_placa(request: PlacaRequest):
         )
 
 
+async def _total_placas_autorizadas() -> int:
+    """Total de placas autorizadas, em cache até as placas mudarem no banco."""
+    global _total_autorizadas
+    if _total_autorizadas is None:
+        _total_autorizadas = await run_in_threadpool(db_manager.contar_placas_autorizadas)
+    return _total_autorizadas
+
+
 @app.get("/placas-autorizadas", tags=["Gerenciamento"])
-async def listar_placas_autorizadas():
-    """Lista todas as placas autorizadas."""
+async def listar_placas_autorizadas(limite: int = 100, offset: int = 0):
+    """Lista as placas autorizadas, paginadas por limite/offset."""
     try:
-        placas = db_manager.listar_placas_autorizadas()
+        limite = min(max(limite, 1), 500)  # Limita para evitar sobrecarga
+        offset = max(offset, 0)
+
+        placas = await run_in_threadpool(db_manager.listar_placas_autorizadas, limite, offset)
         return {
-            "total": len(placas),
+            "total": await _total_placas_autorizadas(),
+            "limite": limite,
+            "offset": offset,
             "placas": placas
         }
     except Exception as e:
@@ -165,11 +446,25 @@ async def listar_placas_autorizadas():
         )
 
 
-@app.post("/placas", tags=["Gerenciamento"])
-async def adicionar_placa(request: NovaPlacaRequest):
+@app.get("/placas-autorizadas/count", tags=["Gerenciamento"])
+async def contar_placas_autorizadas():
+    """Retorna o total de placas autorizadas."""
+    try:
+        return {"total": await _total_placas_autorizadas()}
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao contar placas: {str(e)}"
+        )
+
+
+@app.post("/placas", tags=["Gerenciamento"], openapi_extra=_openapi_body(NovaPlacaRequest))
+async def adicionar_placa(http_request: Request):
     """Adiciona uma nova placa ao sistema."""
+    request = await _decode_body(http_request, _nova_placa_decoder)
     try:
-        sucesso = db_manager.adicionar_placa(
+        sucesso = await run_in_threadpool(
+            db_manager.adicionar_placa,
             placa=request.placa,
             status=request.status,
             veiculo_modelo=request.veiculo_modelo,
@@ -178,9 +473,11 @@ async def adicionar_placa(request: NovaPlacaRequest):
         )
 
         if sucesso:
+            await _atualizar_placa_em_memoria(request.placa)
+            _invalidar_total_autorizadas()
             return {
                 "message": "Placa adicionada com sucesso",
-                "placa": request.placa.upper(),
+                "placa": request.placa,
                 "status": request.status
             }
         else:
@@ -198,16 +495,20 @@ async def adicionar_placa(request: NovaPlacaRequest):
         )
 
 
-@app.put("/placas/{placa}/status", tags=["Gerenciamento"])
-async def atualizar_status_placa(placa: str, request: AtualizarStatusRequest):
+@app.put("/placas/{placa}/status", tags=["Gerenciamento"], openapi_extra=_openapi_body(AtualizarStatusRequest))
+async def atualizar_status_placa(placa: str, http_request: Request):
     """Atualiza o status de uma placa existente."""
+    request = await _decode_body(http_request, _atualizar_status_decoder)
+    placa = placa.strip().upper()
     try:
-        sucesso = db_manager.atualizar_status_placa(placa, request.status)
+        sucesso = await run_in_threadpool(db_manager.atualizar_status_placa, placa, request.status)
 
         if sucesso:
+            await _atualizar_placa_em_memoria(placa)
+            _invalidar_total_autorizadas()
             return {
                 "message": "Status da placa atualizado com sucesso",
-                "placa": placa.upper(),
+                "placa": placa,
                 "novo_status": request.status
             }
         else:
@@ -225,35 +526,58 @@ async def atualizar_status_placa(placa: str, request: AtualizarStatusRequest):
         )
 
 
+def _stream_logs(rows: Iterator[Dict], limite: int) -> Iterator[bytes]:
+    """
+    Serializa os logs linha a linha com orjson, sem montar a lista completa.
+    O total só é conhecido ao final, por isso vai depois da lista.
+    """
+    yield b'{"limite":%d,"logs":[' % limite
+    total = 0
+    for row in rows:
+        yield (b',' if total else b'') + orjson.dumps(row)
+        total += 1
+    yield b'],"total":%d}' % total
+
+
 @app.get("/logs", tags=["Monitoramento"])
-async def obter_logs_recentes(limite: int = 50):
-    """Obtém os logs de acesso mais recentes."""
+async def obter_logs_recentes(limite: int = 50, antes_de_id: Optional[int] = None):
+    """
+    Obtém os logs de acesso mais recentes.
+
+    Para paginar, passe em `antes_de_id` o menor `id` da página anterior
+    (paginação por chave, que usa o índice da chave primária em vez de OFFSET).
+    """
     try:
-        if limite > 200:
-            limite = 200  # Limita para evitar sobrecarga
+        # Limita para evitar sobrecarga; um limite negativo seria LIMIT -1 (sem limite) no SQLite
+        limite = min(max(limite, 1), 200)
 
-        logs = db_manager.obter_logs_recentes(limite)
-        return {
-            "total": len(logs),
-            "limite": limite,
-            "logs": logs
-        }
+        # A consulta é aberta e a primeira linha lida antes de responder: erros do banco viram 500.
+        # Um erro depois disso (raro, no meio do cursor) só pode truncar o corpo, pois o 200 já foi enviado.
+        rows = db_manager.iter_logs(limite, antes_de_id)
+        primeira = await run_in_threadpool(next, rows, None)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erro ao obter logs: {str(e)}"
         )
 
+    if primeira is not None:
+        rows = itertools.chain((primeira,), rows)
+    return StreamingResponse(_stream_logs(rows, limite), media_type="application/json")
+
 
 @app.get("/estatisticas", tags=["Monitoramento"])
 async def obter_estatisticas():
     """Obtém estatísticas do sistema."""
     try:
-        stats = db_manager.obter_estatisticas()
-        return {
-            "timestamp": datetime.now().isoformat(),
-            "estatisticas": stats
-        }
+        now = time.monotonic()
+        if now >= _stats_cache[0]:
+            stats = await run_in_threadpool(db_manager.obter_estatisticas)
+            _stats_cache[:] = [now + STATS_CACHE_TTL, orjson.dumps({
+                "timestamp": now_iso(),
+                "estatisticas": stats
+            })]
+        return Response(content=_stats_cache[1], media_type="application/json")
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -269,7 +593,7 @@ async def global_exception_handler(request, exc):
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
             "detail": "Erro interno do servidor",
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso()
         }
     )
 
@@ -280,11 +604,19 @@ if __name__ == "__main__":
     print("Iniciando API do Sistema de Cancela...")
     print("Documentação disponível em: http://localhost:8000/docs")
 
+    # Reload apenas em desenvolvimento (RELOAD=1); é incompatível com múltiplos workers
+    reload = os.getenv("RELOAD") == "1"
+    workers = 1 if reload else int(os.getenv("WORKERS", os.cpu_count() or 1))
+
+    # uvloop + httptools (já incluídos em uvicorn[standard]); uvloop não existe no Windows
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
-        log_level="info"
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        workers=workers,
+        reload=reload,
+        log_level="info" if reload else "warning"
     )
 
@@ -2,29 +2,41 @@
 """
 Script de teste para a API do sistema de cancela.
 Testa os principais endpoints da API.
+As validações de placas são disparadas concorrentemente (asyncio + httpx).
 """
 
-import requests
+import asyncio
+import time
+import httpx
 import json
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 class APITester:
     """Classe para testar a API do sistema de cancela."""
     
-    def __init__(self, base_url: str = "http://localhost:8000"):
+    def __init__(self, base_url: str = "http://localhost:8000", concurrency: int = 1):
         """
         Inicializa o testador da API.
         
         Args:
             base_url: URL base da API.
+            concurrency: Quantas vezes cada placa de teste é validada em paralelo.
         """
         self.base_url = base_url
-        self.session = requests.Session()
+        self.concurrency = max(1, concurrency)
+        self.client: Optional[httpx.AsyncClient] = None
+
+    async def __aenter__(self) -> "APITester":
+        self.client = httpx.AsyncClient(base_url=self.base_url, timeout=10)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.client.aclose()
     
-    def test_health_check(self) -> bool:
+    async def test_health_check(self) -> bool:
         """Testa o endpoint de health check."""
         try:
-            response = self.session.get(f"{self.base_url}/health")
+            response = await self.client.get("/health")
             if response.status_code == 200:
                 data = response.json()
                 print("✅ Health check: OK")
@@ -38,7 +50,7 @@ class APITester:
             print(f"❌ Erro no health check: {e}")
             return False
     
-    def test_validar_placa(self, placa: str, confianca_ocr: float = 0.95) -> Dict[str, Any]:
+    async def test_validar_placa(self, placa: str, confianca_ocr: float = 0.95) -> Dict[str, Any]:
         """
         Testa a validação de uma placa.
         
@@ -55,10 +67,7 @@ class APITester:
                 "confianca_ocr": confianca_ocr
             }
             
-            response = self.session.post(
-                f"{self.base_url}/validar-placa",
-                json=payload
-            )
+            response = await self.client.post("/validar-placa", json=payload)
             
             if response.status_code == 200:
                 data = response.json()
@@ -74,10 +83,10 @@ class APITester:
             print(f"❌ Erro ao validar placa {placa}: {e}")
             return {}
     
-    def test_listar_placas_autorizadas(self) -> bool:
+    async def test_listar_placas_autorizadas(self) -> bool:
         """Testa a listagem de placas autorizadas."""
         try:
-            response = self.session.get(f"{self.base_url}/placas-autorizadas")
+            response = await self.client.get("/placas-autorizadas")
             if response.status_code == 200:
                 data = response.json()
                 print(f"✅ Placas autorizadas: {data['total']} encontradas")
@@ -93,7 +102,7 @@ class APITester:
             print(f"❌ Erro ao listar placas: {e}")
             return False
     
-    def test_adicionar_placa(self, placa: str, status: str = "AUTORIZADA") -> bool:
+    async def test_adicionar_placa(self, placa: str, status: str = "AUTORIZADA") -> bool:
         """
         Testa a adição de uma nova placa.
         
@@ -113,10 +122,7 @@ class APITester:
                 "cliente_nome": "Cliente Teste"
             }
             
-            response = self.session.post(
-                f"{self.base_url}/placas",
-                json=payload
-            )
+            response = await self.client.post("/placas", json=payload)
             
             if response.status_code == 200:
                 print(f"✅ Placa {placa} adicionada com sucesso")
@@ -132,10 +138,10 @@ class APITester:
             print(f"❌ Erro ao adicionar placa {placa}: {e}")
             return False
     
-    def test_obter_estatisticas(self) -> bool:
+    async def test_obter_estatisticas(self) -> bool:
         """Testa a obtenção de estatísticas."""
         try:
-            response = self.session.get(f"{self.base_url}/estatisticas")
+            response = await self.client.get("/estatisticas")
             if response.status_code == 200:
                 data = response.json()
                 stats = data['estatisticas']
@@ -153,14 +159,31 @@ class APITester:
             print(f"❌ Erro ao obter estatísticas: {e}")
             return False
     
-    def run_all_tests(self):
+    async def test_validar_placas(self, placas: list) -> list:
+        """
+        Valida as placas concorrentemente, repetindo cada uma `concurrency` vezes.
+        
+        Args:
+            placas: Placas a serem testadas.
+            
+        Returns:
+            Respostas da API, na ordem das requisições.
+        """
+        lote = [placa for placa in placas for _ in range(self.concurrency)]
+        inicio = time.perf_counter()
+        resultados = await asyncio.gather(*(self.test_validar_placa(placa) for placa in lote))
+        duracao = time.perf_counter() - inicio
+        print(f"   {len(lote)} validações em {duracao:.2f}s ({len(lote) / duracao:.1f} req/s)")
+        return resultados
+    
+    async def run_all_tests(self):
         """Executa todos os testes."""
         print("🚀 Iniciando testes da API do Sistema de Cancela")
         print("=" * 60)
         
         # Teste 1: Health check
         print("\n1. Testando health check...")
-        health_ok = self.test_health_check()
+        health_ok = await self.test_health_check()
         
         if not health_ok:
             print("❌ API não está funcionando. Verifique se está rodando.")
@@ -168,26 +191,24 @@ class APITester:
         
         # Teste 2: Listar placas autorizadas
         print("\n2. Testando listagem de placas autorizadas...")
-        self.test_listar_placas_autorizadas()
+        await self.test_listar_placas_autorizadas()
         
         # Teste 3: Validar placas existentes
         print("\n3. Testando validação de placas...")
         placas_teste = ["ABC1234", "DEF5678", "XYZ9999"]  # Última não existe
-        
-        for placa in placas_teste:
-            self.test_validar_placa(placa)
+        await self.test_validar_placas(placas_teste)
         
         # Teste 4: Adicionar nova placa de teste
         print("\n4. Testando adição de nova placa...")
-        self.test_adicionar_placa("TST1234", "AUTORIZADA")
+        await self.test_adicionar_placa("TST1234", "AUTORIZADA")
         
         # Teste 5: Validar a placa recém-adicionada
         print("\n5. Testando validação da placa recém-adicionada...")
-        self.test_validar_placa("TST1234")
+        await self.test_validar_placa("TST1234")
         
         # Teste 6: Obter estatísticas
         print("\n6. Testando obtenção de estatísticas...")
-        self.test_obter_estatisticas()
+        await self.test_obter_estatisticas()
         
         print("\n" + "=" * 60)
         print("✅ Testes concluídos!")
@@ -206,16 +227,24 @@ def main():
         "--placa",
         help="Testa uma placa específica"
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Repete cada validação N vezes em paralelo para medir vazão (padrão: 1)"
+    )
     
     args = parser.parse_args()
-    
-    tester = APITester(args.url)
-    
-    if args.placa:
-        print(f"Testando placa específica: {args.placa}")
-        tester.test_validar_placa(args.placa)
-    else:
-        tester.run_all_tests()
+    asyncio.run(run(args))
+
+async def run(args):
+    """Executa os testes selecionados pela linha de comando."""
+    async with APITester(args.url, args.concurrency) as tester:
+        if args.placa:
+            print(f"Testando placa específica: {args.placa}")
+            await tester.test_validar_placas([args.placa])
+        else:
+            await tester.run_all_tests()
 
 if __name__ == "__main__":
     main()
@@ -10,11 +10,10 @@ Integra captura de imagem, OCR, validação de placas e controle do Arduino.
 import sys
 import os
 import time
+import asyncio
 import threading
-import requests
+import httpx
 from typing import Optional, Dict, Any
-import json
-from datetime import datetime
 import cv2
 
 # Adiciona os diretórios dos módulos ao path
@@ -23,6 +22,9 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from ocr.image_capture import ImageCaptureProcessor
 from arduino.arduino_controller import ArduinoController
 
+# pollKey (OpenCV >= 4.5) processa os eventos da janela sem esperar; em versões antigas, waitKey(1)
+_poll_key = getattr(cv2, "pollKey", None) or (lambda: cv2.waitKey(1))
+
 class CancelaSystem:
     """Classe principal do sistema de cancela automatizada."""
     
@@ -30,7 +32,10 @@ class CancelaSystem:
                  api_url: str = "http://localhost:8000",
                  arduino_port: Optional[str] = None,
                  camera_index: int = 0,
-                 confidence_threshold: float = 0.7):
+                 confidence_threshold: float = 0.7,
+                 cpu_affinity: Optional[set] = None,
+                 detector_model: Optional[str] = None,
+                 cascade_file: Optional[str] = None):
         """
         Inicializa o sistema de cancela.
         """
@@ -38,16 +43,45 @@ class CancelaSystem:
         self.arduino_port = arduino_port
         self.camera_index = camera_index
         self.confidence_threshold = confidence_threshold
+        self.cpu_affinity = cpu_affinity  # Núcleos reservados ao processo de detecção (Linux)
+        self.detector_model = detector_model  # Modelo ONNX de detecção (None: Haar cascade)
+        self.cascade_file = cascade_file      # XML do cascade (None: Haar do projeto)
         self.image_processor: Optional[ImageCaptureProcessor] = None
         self.arduino_controller: Optional[ArduinoController] = None
         self.running = False
-        self.last_processed_plate = None
-        self.last_processed_time = None
+        self._stopped = False
+        # Cooldown por placa: tabela de 16 posições (placa -> último processamento), indexada
+        # pelo hash. Placas alternadas (A, B, A, B) também respeitam o cooldown.
+        self._cool_keys: list = [None] * 16
+        self._cool_ts: list = [0.0] * 16
         self.plate_cooldown = 5.0  # Cooldown para não processar a mesma placa repetidamente
         self.gate_open_duration = 3.0 # Segundos que a cancela fica aberta
+        # Circuit breaker: após api_max_failures falhas seguidas, não chama a API por api_cooldown segundos
+        self.api_max_failures = 3
+        self.api_cooldown = 10.0
+        self._api_fail_count = 0
+        self._api_open_until = 0.0
+        # Validações simultâneas em voo (uma por conexão do pool do cliente HTTP)
+        self.max_inflight_validations = 4
         
         # Lock para evitar condição de corrida ao acessar dados compartilhados entre threads
         self.processing_lock = threading.Lock()
+
+        # Event loop dedicado (em thread daemon) para as validações assíncronas na API.
+        # O cliente HTTP mantém conexões keep-alive, evitando um handshake por placa.
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self._run_event_loop, name="cancela-loop", daemon=True)
+        self._loop_thread.start()
+        # retries=2 refaz apenas falhas de conexão (equivalente ao Retry do requests)
+        self._client = httpx.AsyncClient(
+            base_url=self.api_url,
+            # Conexão e leitura com limites separados e curtos: uma API fora do ar falha rápido
+            timeout=httpx.Timeout(2.0, connect=1.0),
+            transport=httpx.AsyncHTTPTransport(
+                retries=2,
+                limits=httpx.Limits(max_connections=4, max_keepalive_connections=4)
+            )
+        )
         
         print(f"Sistema de Cancela inicializado:")
         print(f"  - API URL: {self.api_url}")
@@ -55,13 +89,39 @@ class CancelaSystem:
         print(f"  - Camera Index: {self.camera_index}")
         print(f"  - Confidence Threshold: {self.confidence_threshold}")
 
+    def _run_event_loop(self):
+        """
+        Executa o event loop das validações até que stop() o interrompa.
+        """
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
     def initialize_components(self) -> bool:
         """
         Inicializa todos os componentes do sistema.
         """
         print("\nInicializando componentes do sistema...")
+        # A API é verificada antes de abrir a câmera e iniciar as threads, que não
+        # teriam quem as liberasse se a inicialização parasse aqui
+        try:
+            # Reutiliza o mesmo cliente keep-alive das validações
+            response = asyncio.run_coroutine_threadsafe(
+                self._client.get("/health"), self._loop
+            ).result()
+            if response.status_code == 200:
+                print("✅ API de validação conectada.")
+        except Exception as e:
+            print(f"❌ Erro ao conectar com a API: {e}")
+            return False
+        
         try:
-            self.image_processor = ImageCaptureProcessor(camera_index=self.camera_index)
+            self.image_processor = ImageCaptureProcessor(camera_index=self.camera_index,
+                                                         detector_model=self.detector_model,
+                                                         cascade_file=self.cascade_file)
+            # Aquece o OCR agora para que o primeiro frame não pague a latência de inicialização
+            self.image_processor.ocr_engine.warmup()
+            # Câmera e detecção em threads próprias; o loop só exibe e despacha os resultados
+            self.image_processor.start_processing_thread()
             print("✅ Processador de imagem inicializado.")
         except Exception as e:
             print(f"❌ Erro ao inicializar processador de imagem: {e}")
@@ -71,31 +131,37 @@ class CancelaSystem:
             try:
                 self.arduino_controller = ArduinoController(port=self.arduino_port)
                 if self.arduino_controller.connect():
+                    # A ida e volta serial fica no caminho crítico da abertura da cancela
+                    self.arduino_controller.enable_low_latency()
                     print("✅ Controlador Arduino inicializado.")
                 else:
                     self.arduino_controller = None
             except Exception as e:
                 self.arduino_controller = None
         
-        try:
-            response = requests.get(f"{self.api_url}/health", timeout=5)
-            if response.status_code == 200:
-                print("✅ API de validação conectada.")
-        except Exception as e:
-            print(f"❌ Erro ao conectar com a API: {e}")
-            return False
-        
         return True
 
-    def validate_plate_with_api(self, plate: str, confidence: float) -> Dict[str, Any]:
+    async def validate_plate_with_api(self, plate: str, confidence: float) -> Dict[str, Any]:
         """
-        Valida uma placa usando a API.
+        Valida uma placa usando a API. Toda decisão vem do índice em memória da API
+        (atualizado a cada mudança no banco), e a chamada também registra o acesso.
         """
+        now = time.monotonic()
+        if now < self._api_open_until:
+            return {"autorizada": False, "status": "API_DOWN", "acao_cancela": "FECHADA"}
+
         try:
             payload = {"placa": plate, "confianca_ocr": confidence}
-            response = requests.post(f"{self.api_url}/validar-placa", json=payload, timeout=10)
-            return response.json()
+            response = await self._client.post("/validar-placa", json=payload)
+            result = response.json()
+            self._api_fail_count = 0
+            return result
         except Exception as e:
+            self._api_fail_count += 1
+            if self._api_fail_count >= self.api_max_failures:
+                print(f"⚠️  API indisponível ({e}). Pausando validações por {self.api_cooldown} segundos.")
+                self._api_open_until = now + self.api_cooldown
+                self._api_fail_count = 0
             return {"autorizada": False, "status": "ERRO_CONEXAO", "acao_cancela": "FECHADA"}
 
     def control_gate(self, action: str) -> bool:
@@ -117,42 +183,48 @@ class CancelaSystem:
             print(f"Erro ao controlar cancela: {e}")
             return False
 
-    def process_detected_plate(self, plate_info: Dict[str, Any]):
+    def should_process_plate(self, plate: str) -> bool:
         """
-        Processa uma placa detectada (executado em uma thread separada).
+        Indica se a placa deve ser processada, respeitando o cooldown.
+        Chamado no loop de detecção, antes de agendar o processamento, para que
+        frames repetidos do mesmo carro não cheguem a ocupar o event loop.
         """
-        plate = plate_info["placa"]
-        confidence = plate_info["confianca"]
-        
         # Usamos um lock para garantir que a checagem e a atualização do estado
         # não aconteçam ao mesmo tempo por múltiplas threads.
+        h = hash(plate) & 15
         with self.processing_lock:
-            current_time = time.time()
-            if (self.last_processed_plate == plate and 
-                current_time - self.last_processed_time < self.plate_cooldown):
-                return  # Ignora a placa pois foi processada recentemente
+            current_time = time.monotonic()
+            if self._cool_keys[h] == plate and current_time - self._cool_ts[h] < self.plate_cooldown:
+                return False  # Ignora a placa pois foi processada recentemente
+
+            # Colisão de hash apenas substitui a entrada anterior
+            self._cool_keys[h] = plate
+            self._cool_ts[h] = current_time
+            return True
 
-            # Atualiza o tempo imediatamente para que outras threads já saibam
-            self.last_processed_plate = plate
-            self.last_processed_time = time.time()
+    async def process_detected_plate(self, plate_info: Dict[str, Any]):
+        """
+        Processa uma placa detectada (executado no event loop das validações).
+        """
+        # Confiança e cooldown já foram filtrados no loop de detecção
+        plate = plate_info["placa"]
+        confidence = plate_info["confianca"]
 
         print(f"\n🔍 Placa detectada: {plate} (Confiança: {confidence:.2f})")
-        
-        if confidence < self.confidence_threshold:
-            print(f"⚠️  Confiança baixa. Ignorando.")
-            return
 
-        validation_result = self.validate_plate_with_api(plate, confidence)
+        validation_result = await self.validate_plate_with_api(plate, confidence)
         autorizada = validation_result.get("autorizada", False)
         
         # --- LÓGICA DE AUTO-CLOSE AQUI ---
         if autorizada:
             print(f"✅ Placa {plate} AUTORIZADA - Abrindo cancela.")
+            # O ArduinoController só enfileira o comando (a escrita serial é feita
+            # pela thread dele), então pode ser chamado direto do event loop
             if self.control_gate("ABRIR"):
-                print(f"🚪 Cancela ABERTA. Fechará em {self.gate_open_duration} segundos.")
-                # Agenda o fechamento da cancela para daqui a X segundos
-                timer = threading.Timer(self.gate_open_duration, self.control_gate, args=["FECHAR"])
-                timer.start()
+                # True só indica que o comando foi aceito; a confirmação da escrita é do writer
+                print(f"🚪 Comando de abertura enviado. Fechará em {self.gate_open_duration} segundos.")
+                # Agenda o fechamento no event loop (sem criar uma thread de Timer por abertura)
+                self._loop.call_later(self.gate_open_duration, self.control_gate, "FECHAR")
         else:
             status = validation_result.get("status", "DESCONHECIDO")
             print(f"❌ Placa {plate} NÃO AUTORIZADA ({status})")
@@ -165,42 +237,79 @@ class CancelaSystem:
         print("\n🚀 Iniciando loop de detecção de placas...")
         print("Pressione 'q' na janela da webcam para parar o sistema.")
         
+        inflight = set()  # Futures das validações agendadas; só esta thread mexe no conjunto
         while self.running:
             try:
-                frame, plate_info = self.image_processor.capture_and_process_frame()
+                # Detecção e OCR rodam na thread do processador; frames que chegam enquanto
+                # ela trabalha são descartados pela thread de captura
+                frame, plate_info = self.image_processor.read_processed()
                 
                 if frame is not None:
                     cv2.imshow("Sistema de Cancela - TCC", frame)
                 
-                if cv2.waitKey(1) & 0xFF == ord('q'):
+                # Sem espera fixa: o ritmo vem da câmera (read_processed bloqueia até o próximo frame)
+                if _poll_key() & 0xFF == ord('q'):
                     self.stop()
                     break
 
                 # --- OTIMIZAÇÃO DE PERFORMANCE AQUI ---
-                if plate_info:
-                    # Dispara o processamento pesado em uma nova thread para
-                    # não bloquear a exibição do vídeo.
-                    thread = threading.Thread(target=self.process_detected_plate, args=(plate_info,))
-                    thread.start()
+                # Filtros baratos primeiro: confiança e cooldown, antes de qualquer formatação de log
+                if plate_info and plate_info["confianca"] >= self.confidence_threshold:
+                    inflight = {f for f in inflight if not f.done()}
+                    # Com a API lenta, não acumula validações: descarta até liberar uma vaga
+                    if (len(inflight) < self.max_inflight_validations
+                            and self.should_process_plate(plate_info["placa"])):
+                        # Agenda o processamento no event loop das validações para
+                        # não bloquear a exibição do vídeo.
+                        inflight.add(asyncio.run_coroutine_threadsafe(
+                            self.process_detected_plate(plate_info), self._loop
+                        ))
                 
             except Exception as e:
                 print(f"❌ Erro no loop de detecção: {e}")
                 time.sleep(1)
 
+    def _pin_cpu_affinity(self):
+        """
+        Fixa o processo nos núcleos configurados, mantendo o OCR no mesmo cache de CPU.
+        """
+        if not self.cpu_affinity:
+            return
+        if not hasattr(os, "sched_setaffinity"):
+            print("⚠️  Afinidade de CPU não suportada nesta plataforma.")
+            return
+        try:
+            os.sched_setaffinity(0, self.cpu_affinity)
+            print(f"✅ Processo fixado nos núcleos {sorted(self.cpu_affinity)}.")
+        except OSError as e:
+            print(f"⚠️  Não foi possível definir a afinidade de CPU: {e}")
+
     def start(self):
+        self._pin_cpu_affinity()
         if not self.initialize_components():
             return
         self.running = True
         self.run_detection_loop()
 
     def stop(self):
-        if not self.running: return
+        # Libera os recursos mesmo se start() falhou na inicialização (running nunca ficou True)
+        if self._stopped: return
+        self._stopped = True
         print("\n🛑 Parando Sistema de Cancela...")
-        self.running = False
-        time.sleep(0.5) # Dá um tempo para as threads finalizarem
+        if self.running:
+            self.running = False
+            time.sleep(0.5) # Dá um tempo para as threads finalizarem
+        if self.image_processor:
+            self.image_processor.stop_processing_thread()
+            self.image_processor.stop_capture_thread()
         if self.arduino_controller:
             self.control_gate("FECHAR")
             self.arduino_controller.disconnect()
+        try:
+            asyncio.run_coroutine_threadsafe(self._client.aclose(), self._loop).result(timeout=2)
+        except Exception as e:
+            print(f"Erro ao fechar cliente HTTP: {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
         cv2.destroyAllWindows()
         print("✅ Sistema parado com sucesso!")
 
@@ -217,8 +326,15 @@ def main():
     parser.add_argument("--arduino-port", default=None, help="Porta serial do Arduino")
     parser.add_argument("--camera", type=int, default=0, help="Índice da câmera")
     parser.add_argument("--confidence", type=float, default=0.7, help="Confiança mínima do OCR")
+    parser.add_argument("--cpu-affinity", type=int, nargs="+", default=None, help="Núcleos de CPU reservados à detecção (Linux)")
+    parser.add_argument("--detector-model", default=None, help="Modelo ONNX de detecção de placas (padrão: Haar cascade)")
+    parser.add_argument("--cascade", default=None, help="XML do cascade de placas, Haar ou LBP (padrão: Haar do projeto)")
     args = parser.parse_args()
-    system = CancelaSystem(api_url=args.api_url, arduino_port=args.arduino_port, camera_index=args.camera, confidence_threshold=args.confidence)
+    system = CancelaSystem(api_url=args.api_url, arduino_port=args.arduino_port, camera_index=args.camera,
+                           confidence_threshold=args.confidence,
+                           cpu_affinity=set(args.cpu_affinity) if args.cpu_affinity else None,
+                           detector_model=args.detector_model,
+                           cascade_file=args.cascade)
     system.run_interactive_mode()
 
 if __name__ == "__main__":
@@ -2,328 +2,395 @@
 """
 Interface web simples para monitoramento do sistema de cancela.
 Utiliza Flask para criar uma interface de monitoramento em tempo real com CRUD completo.
+
+Produção com gevent (I/O cooperativo, uma greenlet por conexão SSE):
+    USE_GEVENT=1 gunicorn -k gevent -w 4 --worker-connections 1000 app.web_interface:app --bind 0.0.0.0:8080
+
+Atrás de um proxy HTTP/2 (ex.: nginx com "listen 443 ssl http2;" e "proxy_pass http://127.0.0.1:8080;"),
+a carga do dashboard, o stream SSE e as ações compartilham uma única conexão TLS. Em
+/api/events, desligue o buffer do proxy ("proxy_buffering off;") para os eventos chegarem na hora.
 """
 
-from flask import Flask, render_template, jsonify, request
-import sys
 import os
-import requests
-from datetime import datetime
+
+# O monkey patch do gevent precisa acontecer antes de qualquer outro import
+if os.environ.get('USE_GEVENT'):
+    from gevent import monkey
+    monkey.patch_all()
+
+from flask import Flask, Response, g, jsonify, request
+from flask.json.provider import DefaultJSONProvider
+import sys
+import time
+import gzip
+import hashlib
+import threading
+import orjson
+from cachetools import TTLCache
+from datetime import date
+from typing import Optional
+
+# Tentar importar o waitress (servidor WSGI de produção, multi-thread)
+try:
+    from waitress import serve
+    _HAS_WAITRESS = True
+except Exception:
+    _HAS_WAITRESS = False
+
+# Tentar importar Flask-Compress (compressão gzip/brotli das respostas)
+try:
+    from flask_compress import Compress
+    _HAS_COMPRESS = True
+except Exception:
+    _HAS_COMPRESS = False
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from database.db_manager import DatabaseManager
+from ocr import plate_format
+from ocr.plate_format import validar_placas
+# Formato de placa (antigo ABC1234 e Mercosul ABC1D23), o mesmo aceito pelo OCR,
+# checado antes de ir ao banco
+from ocr.ocr_engine import PLATE_RE
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Provider JSON do Flask baseado em orjson (usado por jsonify)."""
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=self.default).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def dumpb(self, obj) -> bytes:
+        """Serializa direto para bytes, sem o decode/encode de dumps()."""
+        return orjson.dumps(obj, default=self.default)
+
+    def response(self, *args, **kwargs):
+        # jsonify: entrega os bytes do orjson à resposta sem passar por str
+        return self._app.response_class(self.dumpb(self._prepare_response_obj(args, kwargs)), mimetype=self.mimetype)
 
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 app.config['SECRET_KEY'] = 'sistema_cancela_2024'
-API_URL = "http://localhost:8000"
-db_manager = DatabaseManager()
+if _HAS_COMPRESS:
+    app.config['COMPRESS_MIN_SIZE'] = 500
+    app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+    app.config['COMPRESS_STREAMS'] = False  # Não comprimir o stream SSE de /api/events
+    Compress(app)
+# Threads do waitress: as das requisições comuns mais uma por conexão SSE permitida (cada
+# stream fica com a sua thread enquanto aberto), para o SSE nunca tomar as das demais rotas
+REQUEST_THREADS = 8
+# Com gevent cada stream é só uma greenlet (não prende thread), então o limite pode ser bem maior
+SSE_MAX_CLIENTES = 200 if os.environ.get('USE_GEVENT') else 4
+WEB_THREADS = REQUEST_THREADS + SSE_MAX_CLIENTES
+# Uma conexão do pool por thread de requisição comum, mais a da thread do notificador SSE
+# (os streams SSE não fixam conexão; só recebem o que o notificador já consultou)
+db_manager = DatabaseManager(pool_size=REQUEST_THREADS + 1)
+
+def get_db() -> DatabaseManager:
+    """Fixa uma conexão do pool na requisição atual (devolvida no teardown)."""
+    if 'db' not in g:
+        g.db = db_manager.fixar_conexao()
+    return db_manager
+
+@app.teardown_appcontext
+def _liberar_db(exc):
+    if g.pop('db', None) is not None:
+        db_manager.liberar_conexao()
+# Versão das placas, incrementada nas rotas de escrita (compõe o ETag junto com o banco)
+app.config['PLACAS_VERSION'] = 0
+
+def _etag(*partes) -> str:
+    return '-'.join(str(p) for p in partes)
+
+def _nao_modificado(etag: str) -> bool:
+    return etag in request.if_none_match
+
+# Cache das respostas já serializadas de placas e estatísticas, por (rota, ETag). O waitress
+# atende em várias threads, então o acesso passa por um lock. Limpo em toda escrita bem-sucedida.
+app.cache = TTLCache(maxsize=256, ttl=30)
+_cache_lock = threading.Lock()
+
+def _cached(chave, calcular):
+    with _cache_lock:
+        valor = app.cache.get(chave)
+    if valor is None:
+        valor = calcular()
+        with _cache_lock:
+            app.cache[chave] = valor
+    return valor
+
+def _bump_placas_version():
+    with _cache_lock:
+        app.cache.clear()
+        app.config['PLACAS_VERSION'] += 1
+
+# Tabela de placas renderizada no servidor (compilada uma vez; ver /api/placas.html)
+PLACAS_TPL = '''
+{%- if placas -%}
+<table class="table"><thead><tr><th>Placa</th><th>Status</th><th>Modelo</th><th>Cor</th><th>Cliente</th><th>Ações</th></tr></thead><tbody>
+{%- for p in placas %}
+<tr>
+    <td><strong>{{ p.placa }}</strong></td>
+    <td><span class="badge {{ BADGES.get(p.status, 'badge-secondary') }}">{{ p.status | replace('NAO_AUTORIZADA', 'NÃO AUTORIZADA') }}</span></td>
+    <td>{{ p.veiculo_modelo or '-' }}</td>
+    <td>{{ p.veiculo_cor or '-' }}</td>
+    <td>{{ p.cliente_nome or '-' }}</td>
+    <td>
+        <button class="btn btn-warning" onclick='openEditModal({{ p | tojson }})'>Editar</button>
+        {%- if p.status != 'INATIVA' %}
+        <button class="btn btn-danger" onclick="deactivatePlate('{{ p.placa }}')">Desativar</button>
+        {%- endif %}
+    </td>
+</tr>
+{%- endfor %}
+</tbody></table>
+{%- else -%}
+<p>Nenhuma placa cadastrada.</p>
+{%- endif -%}
+'''
+_placas_tpl = app.jinja_env.from_string(PLACAS_TPL)
+
+def _render_placas(placas) -> str:
+    return _placas_tpl.render(placas=placas, BADGES={'AUTORIZADA': 'badge-success', 'NAO_AUTORIZADA': 'badge-danger'})
+
+def _carregar_dashboard():
+    """Lê o dashboard (HTML estático, sem variáveis) uma vez e pré-comprime com gzip."""
+    with open(os.path.join(app.root_path, 'templates', 'dashboard.html'), 'rb') as f:
+        html = f.read()
+    return html, gzip.compress(html, 9), hashlib.md5(html).hexdigest()
+
+_DASHBOARD_HTML, _DASHBOARD_GZ, _DASHBOARD_ETAG = _carregar_dashboard()
 
 @app.route('/')
 def index():
-    return render_template('dashboard.html')
+    if _nao_modificado(_DASHBOARD_ETAG):
+        return '', 304
+    usar_gzip = request.accept_encodings['gzip'] > 0
+    resp = Response(_DASHBOARD_GZ if usar_gzip else _DASHBOARD_HTML, mimetype='text/html')
+    if usar_gzip:
+        resp.headers['Content-Encoding'] = 'gzip'
+    resp.headers['Vary'] = 'Accept-Encoding'
+    resp.headers['Cache-Control'] = 'public, max-age=300'
+    resp.set_etag(_DASHBOARD_ETAG)
+    return resp
 
 # --- ROTAS DA API ---
 
 @app.route('/api/stats')
 def get_stats():
-    stats = db_manager.obter_estatisticas()
-    return jsonify({'success': True, 'data': stats})
+    # As estatísticas dependem das placas, dos logs e do dia corrente
+    assinaturas = get_db().obter_assinaturas()
+    etag = _etag(app.config['PLACAS_VERSION'], assinaturas['logs'], *assinaturas['placas'], date.today())
+    if _nao_modificado(etag):
+        return '', 304
+    body = _cached(('stats', etag), lambda: app.json.dumpb({'success': True, 'data': get_db().obter_estatisticas()}))
+    resp = Response(body, mimetype='application/json')
+    resp.set_etag(etag)
+    return resp
 
 @app.route('/api/logs')
 def get_logs():
-    logs = db_manager.obter_logs_recentes(limite=20)
+    logs = get_db().obter_logs_recentes(limite=20)
     return jsonify({'success': True, 'data': logs})
 
+@app.route('/api/logs.ndjson')
+def get_logs_ndjson():
+    # Um log por linha, lido do cursor e enviado conforme é serializado (memória constante)
+    # Limite negativo viraria LIMIT -1 (sem limite) no SQLite
+    limite = max(1, min(request.args.get('limite', 20, type=int), 200))
+    def gerar():
+        for row in db_manager.iter_logs(limite):
+            yield orjson.dumps(row) + b"\n"
+    return Response(gerar(), mimetype='application/x-ndjson')
+
+@app.route('/api/dashboard')
+def get_dashboard():
+    # Estatísticas, logs e placas em uma única requisição (carga inicial do dashboard)
+    dados = get_db().obter_dashboard(limite_logs=20)
+    dados['placas_html'] = _render_placas(dados.pop('placas'))
+    return jsonify({'success': True, 'data': dados})
+
 @app.route('/api/placas')
 def get_placas():
-    placas = db_manager.listar_todas_as_placas()
-    return jsonify({'success': True, 'data': placas})
+    # A assinatura do banco cobre placas alteradas por outros processos (ex.: POST /placas da API)
+    etag = _etag(app.config['PLACAS_VERSION'], *get_db().obter_assinaturas()['placas'])
+    if _nao_modificado(etag):
+        return '', 304
+    body = _cached(('json', etag), lambda: app.json.dumpb({'success': True, 'data': get_db().listar_todas_as_placas()}))
+    resp = Response(body, mimetype='application/json')
+    resp.set_etag(etag)
+    return resp
+
+@app.route('/api/placas.html')
+def get_placas_html():
+    # Mesma validação por ETag de /api/placas, mas devolvendo a tabela já renderizada
+    etag = _etag('html', app.config['PLACAS_VERSION'], *get_db().obter_assinaturas()['placas'])
+    if _nao_modificado(etag):
+        return '', 304
+    html = _cached(('html', etag), lambda: _render_placas(get_db().listar_todas_as_placas()))
+    resp = Response(html, mimetype='text/html')
+    resp.set_etag(etag)
+    return resp
 
 @app.route('/api/add-plate', methods=['POST'])
 def add_plate():
     data = request.get_json()
-    sucesso = db_manager.adicionar_placa(
-        placa=data.get('placa', '').strip().upper(), status=data.get('status'),
+    placa = data.get('placa', '').strip().upper()
+    if not PLATE_RE.match(placa):
+        return jsonify({'success': False, 'error': 'Formato de placa inválido'}), 400
+    sucesso = get_db().adicionar_placa(
+        placa=placa, status=data.get('status'),
         veiculo_modelo=data.get('modelo'), veiculo_cor=data.get('cor'),
         cliente_nome=data.get('cliente')
     )
-    if sucesso: return jsonify({'success': True, 'message': 'Placa adicionada com sucesso'})
+    if sucesso:
+        _bump_placas_version()
+        return jsonify({'success': True, 'message': 'Placa adicionada com sucesso'})
     return jsonify({'success': False, 'error': 'Placa já existe no sistema'}), 409
 
+@app.route('/api/add-plates-bulk', methods=['POST'])
+def add_plates_bulk():
+    # Corpo: {"placas": [{"placa", "status", "modelo", "cor", "cliente"}, ...]}, gravado em uma transação
+    data = request.get_json()
+    registros, invalidas = [], []
+    for item in data.get('placas', []):
+        placa = (item.get('placa') or '').strip().upper()
+        if not PLATE_RE.match(placa) or item.get('status') not in ('AUTORIZADA', 'NAO_AUTORIZADA'):
+            invalidas.append(placa)
+            continue
+        registros.append((placa, item['status'], item.get('modelo'), item.get('cor'), item.get('cliente')))
+    resultado = get_db().adicionar_placas_bulk(registros)
+    if resultado['inserted']:
+        _bump_placas_version()
+    resultado['invalid'] = invalidas
+    return jsonify({'success': True, 'data': resultado})
+
 @app.route('/api/update-plate/<placa>', methods=['PUT'])
 def update_plate(placa):
     data = request.get_json()
-    sucesso = db_manager.atualizar_placa(
+    sucesso = get_db().atualizar_placa(
         placa=placa, status=data.get('status'),
         veiculo_modelo=data.get('modelo'), veiculo_cor=data.get('cor'),
         cliente_nome=data.get('cliente')
     )
-    if sucesso: return jsonify({'success': True, 'message': 'Placa atualizada com sucesso'})
+    if sucesso:
+        _bump_placas_version()
+        return jsonify({'success': True, 'message': 'Placa atualizada com sucesso'})
     return jsonify({'success': False, 'error': 'Falha ao atualizar a placa'}), 500
 
+# Compila o validador em lote na carga do módulo (uma vez no master com gunicorn --preload)
+plate_format.warmup()
+
+@app.route('/api/validate-batch', methods=['POST'])
+def validate_batch():
+    # Corpo: placas separadas por quebra de linha (ou espaços). Valida só o formato, em lote.
+    placas, validas = validar_placas(request.get_data().split())
+    return jsonify({'success': True, 'data': {'placas': placas, 'validas': validas}})
+
+# Cada conexão SSE ocupa uma thread do servidor enquanto está aberta: o número de clientes
+# simultâneos é limitado (SSE_MAX_CLIENTES, já somado a WEB_THREADS) e cada stream é encerrado
+# após SSE_DURACAO segundos (o EventSource reconecta sozinho depois de SSE_RETRY_MS).
+SSE_DURACAO = 60.0
+SSE_RETRY_MS = 3000
+SSE_RETRY_LOTADO_MS = 10000
+
+class _NotificadorSSE:
+    """
+    Observa o banco em uma única thread e distribui para todas as conexões SSE o que
+    mudou, junto com as estatísticas já calculadas (uma consulta, N clientes).
+    """
+
+    def __init__(self):
+        self._vagas = threading.BoundedSemaphore(SSE_MAX_CLIENTES)
+        self._cond = threading.Condition()
+        self._seq = 0
+        self._evento = b""
+        self._thread: Optional[threading.Thread] = None
+
+    def _garantir_thread(self):
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._observar, name="dashboard-sse", daemon=True)
+                self._thread.start()
+
+    def _observar(self):
+        while True:
+            try:
+                for mudancas in db_manager.observar_mudancas():
+                    if mudancas['logs'] or mudancas['placas']:
+                        self._publicar(mudancas)
+            except Exception as e:
+                print(f"Erro ao observar o banco para o SSE: {e}")
+                time.sleep(1)
+
+    def _publicar(self, mudancas):
+        stats = db_manager.obter_estatisticas()
+        evento = (b"event: stats\ndata: " + orjson.dumps(stats) + b"\n\n"
+                  + b"event: changes\ndata: " + orjson.dumps(mudancas) + b"\n\n")
+        with self._cond:
+            self._seq += 1
+            self._evento = evento
+            self._cond.notify_all()
+
+    def assinar(self, keepalive: float = 15.0, duracao: float = SSE_DURACAO):
+        """
+        Gera os eventos de um cliente; sem mudanças por keepalive segundos, envia um ping.
+        O stream termina após duracao segundos. Sem vaga, só orienta o cliente a tentar de novo.
+        """
+        if not self._vagas.acquire(blocking=False):
+            yield f"retry: {SSE_RETRY_LOTADO_MS}\n\n".encode()
+            return
+        try:
+            self._garantir_thread()
+            yield f"retry: {SSE_RETRY_MS}\n\n".encode()
+            with self._cond:
+                visto = self._seq
+            fim = time.monotonic() + duracao
+            while True:
+                restante = fim - time.monotonic()
+                if restante <= 0:
+                    return
+                with self._cond:
+                    self._cond.wait_for(lambda: self._seq != visto, min(keepalive, restante))
+                    seq, evento = self._seq, self._evento
+                if seq == visto:
+                    yield b": ping\n\n"  # Keep-alive: também detecta clientes desconectados
+                else:
+                    visto = seq
+                    yield evento
+        finally:
+            # Também roda quando o servidor fecha o gerador de um cliente desconectado
+            self._vagas.release()
+
+_notificador = _NotificadorSSE()
+
+@app.route('/api/events')
+def events():
+    """
+    Stream SSE: evento "stats" com as estatísticas atualizadas e evento "changes" com
+    o que mudou no banco ({"logs": bool, "placas": bool}), para recarregar só o necessário.
+    """
+    return Response(_notificador.assinar(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
 # --- MUDANÇA NA API: De DELETE para PUT (Desativar) ---
 @app.route('/api/deactivate-plate/<placa>', methods=['PUT'])
 def deactivate_plate(placa):
     # Chama o novo método 'desativar_placa'
-    sucesso = db_manager.desativar_placa(placa)
-    if sucesso: return jsonify({'success': True, 'message': 'Placa desativada com sucesso'})
+    sucesso = get_db().desativar_placa(placa)
+    if sucesso:
+        _bump_placas_version()
+        return jsonify({'success': True, 'message': 'Placa desativada com sucesso'})
     return jsonify({'success': False, 'error': 'Falha ao desativar a placa'}), 500
 # --- FIM DA MUDANÇA ---
 
-# --- TEMPLATE HTML COMPLETO E CORRIGIDO ---
-template_html = '''
-<!DOCTYPE html>
-<html lang="pt-BR">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Sistema de Cancela - Dashboard</title>
-    <style>
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        body { font-family: 'Segoe UI', sans-serif; background-color: #f5f5f5; color: #333; }
-        .header { background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 1rem 2rem; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }
-        .header h1 { font-size: 2rem; }
-        .container { max-width: 1200px; margin: 2rem auto; padding: 0 1rem; }
-        .stats-grid { display: grid; grid-template-columns: repeat(auto-fit, minmax(240px, 1fr)); gap: 1rem; margin-bottom: 2rem; }
-        .stat-card { background: white; padding: 1.5rem; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); text-align: center; }
-        .stat-card h3 { color: #667eea; font-size: 2rem; margin-bottom: 0.5rem; }
-        .section { background: white; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); margin-bottom: 2rem; overflow: hidden; }
-        .section-header { background: #f8f9fa; padding: 1rem 1.5rem; border-bottom: 1px solid #e9ecef; }
-        .section-header h2 { color: #495057; font-size: 1.2rem; }
-        .section-content { padding: 1.5rem; }
-        .form-group { margin-bottom: 1rem; }
-        .form-group label { display: block; margin-bottom: 0.5rem; font-weight: 500; }
-        .form-group input, .form-group select { width: 100%; padding: 0.75rem; border: 1px solid #ddd; border-radius: 5px; font-size: 1rem; }
-        .btn { color: white; padding: 0.5rem 1rem; border: none; border-radius: 5px; cursor: pointer; font-size: 0.9rem; transition: background 0.3s; margin-right: 0.5rem;}
-        .btn:hover { opacity: 0.9; }
-        .btn-success { background: #28a745; }
-        .btn-warning { background: #ffc107; }
-        .btn-danger { background: #dc3545; }
-        .table { width: 100%; border-collapse: collapse; }
-        .table th, .table td { padding: 0.75rem; text-align: left; border-bottom: 1px solid #e9ecef; }
-        .badge { padding: 0.25rem 0.5rem; border-radius: 20px; font-size: 0.8rem; font-weight: 500; color: white; }
-        .badge-success { background: #28a745; }
-        .badge-danger { background: #dc3545; }
-        /* --- MUDANÇA NO CSS: Adicionando cor para status INATIVO --- */
-        .badge-secondary { background: #6c757d; } 
-        .message { padding: 1rem; border-radius: 5px; margin-bottom: 1rem; }
-        .error { background: #f8d7da; color: #721c24; }
-        .success { background: #d4edda; color: #155724; }
-        .modal { display: none; position: fixed; z-index: 1000; left: 0; top: 0; width: 100%; height: 100%; background-color: rgba(0,0,0,0.5); }
-        .modal-content { background-color: #fefefe; margin: 10% auto; padding: 20px; border: 1px solid #888; width: 80%; max-width: 500px; border-radius: 10px; }
-        .close-btn { color: #aaa; float: right; font-size: 28px; font-weight: bold; cursor: pointer; }
-    </style>
-</head>
-<body>
-    <div class="header"><h1>Sistema de Cancela</h1><p>Dashboard de Monitoramento e Controle</p></div>
-    <div class="container">
-        <div class="stats-grid" id="stats-grid">
-            <div class="stat-card"><h3 id="stat-autorizadas">-</h3><p>Placas Autorizadas</p></div>
-            <div class="stat-card"><h3 id="stat-nao-autorizadas">-</h3><p>Placas Não Autorizadas</p></div>
-            <div class="stat-card"><h3 id="stat-acessos-hoje">-</h3><p>Acessos Hoje</p></div>
-            <div class="stat-card"><h3 id="stat-taxa-autorizacao">-</h3><p>Taxa de Autorização</p></div>
-        </div>
-        
-        <div class="section">
-            <div class="section-header"><h2>Gerenciamento de Placas</h2></div>
-            <div class="section-content">
-                <div id="plates-message"></div>
-                <div id="plates-list-content" style="max-height: 400px; overflow-y: auto;"></div>
-            </div>
-        </div>
-
-        <div class="section">
-            <div class="section-header"><h2>Adicionar Nova Placa</h2></div>
-            <div class="section-content">
-                <div id="add-plate-message"></div>
-                <form id="add-plate-form">
-                    <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 1rem;">
-                        <div class="form-group"><label for="nova-placa">Placa:</label><input type="text" id="nova-placa" required style="text-transform: uppercase;"></div>
-                        <div class="form-group"><label for="status-placa">Status:</label>
-                            <select id="status-placa" required>
-                                <option value="AUTORIZADA">Autorizada</option>
-                                <option value="NAO_AUTORIZADA">Não Autorizada</option>
-                                </select>
-                        </div>
-                        <div class="form-group"><label for="modelo-veiculo">Modelo:</label><input type="text" id="modelo-veiculo"></div>
-                        <div class="form-group"><label for="cor-veiculo">Cor:</label><input type="text" id="cor-veiculo"></div>
-                        <div class="form-group"><label for="nome-cliente">Cliente:</label><input type="text" id="nome-cliente"></div>
-                    </div>
-                    <button type="submit" class="btn btn-success">Adicionar Placa</button>
-                </form>
-            </div>
-        </div>
-
-        <div class="section">
-            <div class="section-header"><h2>Logs de Acesso Recentes</h2></div>
-            <div class="section-content"><div id="logs-content"></div></div>
-        </div>
-    </div>
-
-    <div id="edit-modal" class="modal">
-        <div class="modal-content">
-            <span class="close-btn">&times;</span>
-            <h2>Editar Placa</h2>
-            <div id="edit-plate-message"></div>
-            <form id="edit-plate-form">
-                <input type="hidden" id="edit-placa-original">
-                <div class="form-group"><label>Placa:</label><input type="text" id="edit-placa" disabled class="form-control-plaintext"></div>
-                <div class="form-group"><label for="edit-status">Status:</label>
-                    <select id="edit-status" required>
-                        <option value="AUTORIZADA">Autorizada</option>
-                        <option value="NAO_AUTORIZADA">Não Autorizada</option>
-                        <option value="INATIVA">Inativa</option>
-                    </select>
-                </div>
-                <div class="form-group"><label for="edit-modelo">Modelo:</label><input type="text" id="edit-modelo"></div>
-                <div class="form-group"><label for="edit-cor">Cor:</label><input type="text" id="edit-cor"></div>
-                <div class="form-group"><label for="edit-cliente">Cliente:</label><input type="text" id="edit-cliente"></div>
-                <button type="submit" class="btn btn-success">Salvar Alterações</button>
-            </form>
-        </div>
-    </div>
-
-    <script>
-        document.addEventListener('DOMContentLoaded', () => {
-            loadAllData();
-            setupEventListeners();
-        });
-        setInterval(loadAllData, 30000);
-
-        function loadAllData() { loadStats(); loadLogs(); loadPlates(); }
-
-        async function loadStats() {
-            const result = await fetch('/api/stats').then(res => res.json());
-            if(result.success) {
-                document.getElementById('stat-autorizadas').textContent = result.data.total_placas_autorizadas;
-                document.getElementById('stat-nao-autorizadas').textContent = result.data.total_placas_nao_autorizadas;
-                document.getElementById('stat-acessos-hoje').textContent = result.data.acessos_hoje;
-                document.getElementById('stat-taxa-autorizacao').textContent = result.data.taxa_autorizacao_hoje.toFixed(1) + '%';
-            }
-        }
-        
-        async function loadLogs() {
-            const result = await fetch('/api/logs').then(res => res.json());
-            if(result.success) {
-                const logs = result.data;
-                const container = document.getElementById('logs-content');
-                if (logs.length === 0) { container.innerHTML = '<p>Nenhum log encontrado.</p>'; return; }
-                let table = '<table class="table"><thead><tr><th>Data/Hora</th><th>Placa</th><th>Status</th><th>Ação</th><th>Confiança</th></tr></thead><tbody>';
-                logs.forEach(log => {
-                    table += `<tr><td>${new Date(log.timestamp).toLocaleString('pt-BR')}</td><td><strong>${log.placa}</strong></td><td>${log.status_validacao}</td><td>${log.acao_cancela}</td><td>${log.confianca_ocr ? (log.confianca_ocr * 100).toFixed(1) + '%' : '-'}</td></tr>`;
-                });
-                container.innerHTML = table + '</tbody></table>';
-            }
-        }
-
-        async function loadPlates() {
-            const result = await fetch('/api/placas').then(res => res.json());
-            const container = document.getElementById('plates-list-content');
-            if(result.success) {
-                const plates = result.data;
-                if (plates.length === 0) { container.innerHTML = '<p>Nenhuma placa cadastrada.</p>'; return; }
-                let table = '<table class="table"><thead><tr><th>Placa</th><th>Status</th><th>Modelo</th><th>Cor</th><th>Cliente</th><th>Ações</th></tr></thead><tbody>';
-                
-                plates.forEach(p => {
-                    // --- MUDANÇA NO JAVASCRIPT: Lógica de 3 status para o badge ---
-                    const statusBadge = p.status === 'AUTORIZADA' ? 'badge-success' : (p.status === 'NAO_AUTORIZADA' ? 'badge-danger' : 'badge-secondary');
-                    const statusText = p.status.replace('NAO_AUTORIZADA', 'NÃO AUTORIZADA');
-                    
-                    // Se a placa estiver inativa, não mostra o botão "Desativar"
-                    const actionButton = p.status !== 'INATIVA' ? 
-                        `<button class="btn btn-danger" onclick="deactivatePlate('${p.placa}')">Desativar</button>` :
-                        ''; // Vazio, pois ela já está desativada (pode ser reativada pelo "Editar")
-
-                    table += `
-                        <tr>
-                            <td><strong>${p.placa}</strong></td>
-                            <td><span class="badge ${statusBadge}">${statusText}</span></td>
-                            <td>${p.veiculo_modelo || '-'}</td>
-                            <td>${p.veiculo_cor || '-'}</td>
-                            <td>${p.cliente_nome || '-'}</td>
-                            <td>
-                                <button class="btn btn-warning" onclick='openEditModal(${JSON.stringify(p)})'>Editar</button>
-                                ${actionButton}
-                            </td>
-                        </tr>`;
-                });
-                container.innerHTML = table + '</tbody></table>';
-            } else { container.innerHTML = '<div class="message error">Erro ao carregar placas.</div>';}
-        }
-        
-        const modal = document.getElementById('edit-modal');
-        function openEditModal(plateData) {
-            document.getElementById('edit-plate-message').innerHTML = '';
-            document.getElementById('edit-placa-original').value = plateData.placa;
-            document.getElementById('edit-placa').value = plateData.placa;
-            document.getElementById('edit-status').value = plateData.status;
-            document.getElementById('edit-modelo').value = plateData.veiculo_modelo || '';
-            document.getElementById('edit-cor').value = plateData.veiculo_cor || '';
-            document.getElementById('edit-cliente').value = plateData.cliente_nome || '';
-            modal.style.display = 'block';
-        }
-
-        // --- MUDANÇA NO JAVASCRIPT: Renomeando a função e mudando a lógica ---
-        async function deactivatePlate(placa) {
-            if (!confirm(`Tem certeza que deseja DESATIVAR a placa ${placa}? Ela não será removida, apenas marcada como inativa.`)) return;
-            
-            // Chama a nova rota da API com o método PUT
-            const response = await fetch(`/api/deactivate-plate/${placa}`, { method: 'PUT' });
-            const result = await response.json();
-            
-            showMessage('plates-message', result.success, result.success ? 'Placa desativada com sucesso!' : result.error);
-            if(result.success) loadAllData();
-        }
-        
-        function showMessage(elementId, success, message) {
-            const div = document.getElementById(elementId);
-            div.className = `message ${success ? 'success' : 'error'}`;
-            div.textContent = message;
-            setTimeout(() => div.innerHTML = '', 4000);
-        }
-
-        function setupEventListeners() {
-            document.querySelector('.close-btn').onclick = () => { modal.style.display = 'none'; };
-            window.onclick = (event) => { if (event.target == modal) { modal.style.display = 'none'; } };
-            
-            document.getElementById('add-plate-form').addEventListener('submit', async (e) => {
-                e.preventDefault();
-                const form = e.target;
-                const payload = {
-                    placa: form.querySelector('#nova-placa').value, status: form.querySelector('#status-placa').value,
-                    modelo: form.querySelector('#modelo-veiculo').value, cor: form.querySelector('#cor-veiculo').value,
-                    cliente: form.querySelector('#nome-cliente').value
-                };
-                const response = await fetch('/api/add-plate', { method: 'POST', headers: { 'Content-Type': 'application/json' }, body: JSON.stringify(payload) });
-                const result = await response.json();
-                showMessage('add-plate-message', result.success, result.success ? 'Placa adicionada com sucesso!' : result.error);
-                if (result.success) { form.reset(); loadAllData(); }
-            });
-
-            document.getElementById('edit-plate-form').addEventListener('submit', async (e) => {
-                e.preventDefault();
-                const originalPlaca = document.getElementById('edit-placa-original').value;
-                const payload = {
-                    status: document.getElementById('edit-status').value, modelo: document.getElementById('edit-modelo').value,
-                    cor: document.getElementById('edit-cor').value, cliente: document.getElementById('edit-cliente').value,
-                };
-                const response = await fetch(`/api/update-plate/${originalPlaca}`, { method: 'PUT', headers: { 'Content-Type': 'application/json' }, body: JSON.stringify(payload) });
-                const result = await response.json();
-                showMessage('edit-plate-message', result.success, result.success ? 'Placa atualizada com sucesso!' : result.error);
-                if (result.success) { setTimeout(() => { modal.style.display = 'none'; loadAllData(); }, 1500); }
-            });
-        }
-    </script>
-</body>
-</html>
-'''
-
-templates_dir = os.path.join(os.path.dirname(__file__), 'templates')
-os.makedirs(templates_dir, exist_ok=True)
-with open(os.path.join(templates_dir, 'dashboard.html'), 'w', encoding='utf-8') as f:
-    f.write(template_html)
-
 if __name__ == '__main__':
     print("Iniciando interface web do sistema de cancela...")
     print("Acesse: http://localhost:8080")
-    app.run(host='0.0.0.0', port=8080, debug=True)
\ No newline at end of file
+    # FLASK_DEBUG=1 volta ao servidor de desenvolvimento com reloader e debugger
+    if os.environ.get('FLASK_DEBUG') == '1':
+        app.run(host='0.0.0.0', port=8080, debug=True)
+    elif _HAS_WAITRESS:
+        serve(app, host='0.0.0.0', port=8080, threads=WEB_THREADS)
+    else:
+        app.run(host='0.0.0.0', port=8080, debug=False, threaded=True)
\ No newline at end of file
@@ -4,13 +4,25 @@ Módulo Python para comunicação serial com o Arduino e controle da cancela.
 """
 
 import serial
+import os
 import time
+import queue
+import threading
 from typing import Optional
 
+# Protocolo binário: um byte por comando (deve coincidir com cancela_control.ino)
+COMMAND_CODES = {"ABRIR": b"\x01", "FECHAR": b"\x02"}
+PING = b"\x00"
+READY = b"R"
+
+# Marcador na fila do writer: há um comando no slot _pending para escrever
+_WAKE = object()
+
 class ArduinoController:
     """Classe para controlar o Arduino via comunicação serial."""
     
-    def __init__(self, port: str, baud_rate: int = 9600, timeout: float = 1.0):
+    def __init__(self, port: str, baud_rate: int = 115200, timeout: float = 1.0, debounce: float = 0.5,
+                 ready_timeout: float = 3.0):
         """
         Inicializa o controlador do Arduino.
         
@@ -19,11 +31,27 @@ class ArduinoController:
                   '/dev/ttyACM0' no Linux, 'COM3' no Windows).
             baud_rate: Taxa de transmissão serial (deve ser a mesma configurada no Arduino).
             timeout: Tempo limite para operações de leitura/escrita serial.
+            debounce: Janela (s) em que um comando repetido é descartado.
+            ready_timeout: Tempo máximo (s) de espera pelo sinal de pronto do Arduino.
         """
         self.port = port
         self.baud_rate = baud_rate
         self.timeout = timeout
+        self.ready_timeout = ready_timeout
         self.serial_connection: Optional[serial.Serial] = None
+        # Escrita serial em thread própria: send_command só enfileira e retorna
+        self._cmd_q: queue.Queue = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        # Coalescência: comando repetido dentro de debounce é ignorado, e um comando
+        # ainda não escrito é substituído pelo mais recente em vez de enfileirado.
+        # É intencional também para um ABRIR substituído por FECHAR: escritos em
+        # sequência, a cancela terminaria fechada do mesmo jeito, só que após um
+        # movimento inútil. Vale sempre o estado pedido por último.
+        self.debounce = debounce
+        self._cmd_lock = threading.Lock()
+        self._last_cmd: Optional[str] = None
+        self._last_ts = 0.0
+        self._pending: Optional[str] = None
         
         print(f"ArduinoController inicializado para porta {self.port} com baud rate {self.baud_rate}.")
 
@@ -35,12 +63,20 @@ class ArduinoController:
             True se a conexão foi estabelecida com sucesso, False caso contrário.
         """
         try:
-            self.serial_connection = serial.Serial(
-                self.port, 
-                self.baud_rate, 
-                timeout=self.timeout
-            )
-            time.sleep(2)  # Espera o Arduino reiniciar após a conexão serial
+            # Abre com DTR desligado para não provocar o auto-reset do Arduino
+            self.serial_connection = serial.Serial()
+            self.serial_connection.port = self.port
+            self.serial_connection.baudrate = self.baud_rate
+            self.serial_connection.timeout = self.timeout
+            self.serial_connection.dsrdtr = False
+            self.serial_connection.dtr = False
+            self.serial_connection.open()
+            if not self._aguardar_pronto():
+                print(f"Aviso: Arduino na porta {self.port} não respondeu em {self.ready_timeout}s.")
+            self._cmd_q = queue.Queue()
+            self._pending = None
+            self._writer = threading.Thread(target=self._drain, name="arduino-writer", daemon=True)
+            self._writer.start()
             print(f"Conexão serial estabelecida com sucesso na porta {self.port}.")
             return True
         except serial.SerialException as e:
@@ -48,10 +84,74 @@ class ArduinoController:
             self.serial_connection = None
             return False
 
+    def _aguardar_pronto(self) -> bool:
+        """
+        Espera o Arduino sinalizar que está pronto, no lugar de um sleep fixo.
+        
+        Placas que reiniciam mesmo com DTR desligado enviam 'R' ao fim do setup();
+        as que não reiniciam respondem 'R' ao PING. Em ambos os casos a espera
+        termina assim que o byte chega, limitada a ready_timeout.
+        
+        Returns:
+            True se o sinal de pronto foi recebido, False caso contrário.
+        """
+        conn = self.serial_connection
+        conn.reset_input_buffer()
+        conn.timeout = 0.1
+        try:
+            conn.write(PING)
+            deadline = time.monotonic() + self.ready_timeout
+            while time.monotonic() < deadline:
+                if conn.read(1) == READY:
+                    return True
+            return False
+        finally:
+            conn.timeout = self.timeout
+
+    def enable_low_latency(self) -> bool:
+        """
+        Reduz a latência da porta serial USB no Linux: ativa o ASYNC_LOW_LATENCY
+        do driver e baixa o latency_timer de adaptadores FTDI para 1 ms.
+        Em outras plataformas ou adaptadores, mantém a configuração padrão.
+        
+        Returns:
+            True se alguma das configurações foi aplicada, False caso contrário.
+        """
+        if not self.serial_connection or not self.serial_connection.is_open:
+            return False
+
+        aplicado = False
+        try:
+            self.serial_connection.set_low_latency_mode(True)
+            aplicado = True
+        except (AttributeError, ValueError, OSError) as e:
+            print(f"Aviso: low_latency_mode não suportado na porta {self.port}: {e}")
+
+        # Só existe para adaptadores usb-serial (ex.: /dev/ttyUSB0); ttyACM não tem
+        latency_timer = f"/sys/bus/usb-serial/devices/{os.path.basename(self.port)}/latency_timer"
+        try:
+            with open(latency_timer, "w") as f:
+                f.write("1")
+            aplicado = True
+        except FileNotFoundError:
+            pass
+        except PermissionError:
+            print(f"Aviso: sem permissão para ajustar {latency_timer}.")
+        except OSError as e:
+            print(f"Aviso: não foi possível ajustar {latency_timer}: {e}")
+
+        return aplicado
+
     def disconnect(self):
         """
-        Fecha a conexão serial com o Arduino.
+        Fecha a conexão serial com o Arduino, depois de enviar os comandos pendentes.
         """
+        writer = self._writer
+        if writer is not None:
+            self._writer = None
+            self._cmd_q.put(None)
+            if writer is not threading.current_thread():
+                writer.join(timeout=2)
         if self.serial_connection and self.serial_connection.is_open:
             self.serial_connection.close()
             print(f"Conexão serial na porta {self.port} fechada.")
@@ -59,31 +159,59 @@ class ArduinoController:
 
     def send_command(self, command: str) -> bool:
         """
-        Envia um comando para o Arduino.
+        Enfileira um comando para o Arduino; a escrita serial é feita pela thread _drain,
+        que registra o envio ou o erro.
         
         Args:
             command: O comando a ser enviado (ex: "ABRIR", "FECHAR").
             
         Returns:
-            True se o comando foi enviado com sucesso, False caso contrário.
+            True se o comando foi aceito (enfileirado ou já pendente), False se não há
+            conexão ou o comando é desconhecido.
         """
         if not self.serial_connection or not self.serial_connection.is_open:
             print("ERRO: Conexão serial não estabelecida. Tente conectar primeiro.")
             return False
-        
-        try:
-            self.serial_connection.write(f"{command}\n".encode("utf-8"))
-            print(f"Comando \"{command}\" enviado para o Arduino.")
-            
-            # Opcional: Ler a resposta do Arduino para confirmação
-            # response = self.serial_connection.readline().decode("utf-8").strip()
-            # print(f"Resposta do Arduino: {response}")
-            
-            return True
-        except serial.SerialException as e:
-            print(f"ERRO ao enviar comando para o Arduino: {e}")
-            self.disconnect()
+        if command not in COMMAND_CODES:
+            print(f"ERRO: Comando desconhecido: {command}")
             return False
+        
+        now = time.monotonic()
+        with self._cmd_lock:
+            if command == self._last_cmd and now - self._last_ts < self.debounce:
+                return True  # Mesmo comando há pouco: a cancela já está indo para esse estado
+            self._last_cmd, self._last_ts = command, now
+            agendar = self._pending is None
+            self._pending = command
+
+        # A escrita acontece na thread _drain; aqui só avisamos que há comando pendente
+        if agendar:
+            self._cmd_q.put_nowait(_WAKE)
+        return True
+
+    def _drain(self):
+        """
+        Escreve na porta serial os comandos enfileirados, em ordem.
+        """
+        while True:
+            item = self._cmd_q.get()
+            if item is None:
+                break
+            with self._cmd_lock:
+                command, self._pending = self._pending, None
+            if command is None:
+                continue
+            try:
+                self.serial_connection.write(COMMAND_CODES[command])
+                print(f"Comando \"{command}\" enviado para o Arduino.")
+                
+                # Opcional: Ler a resposta do Arduino para confirmação
+                # response = self.serial_connection.readline().decode("utf-8").strip()
+                # print(f"Resposta do Arduino: {response}")
+            except (serial.SerialException, AttributeError) as e:
+                print(f"ERRO ao enviar comando para o Arduino: {e}")
+                self.disconnect()
+                break
 
     def open_gate(self) -> bool:
         """
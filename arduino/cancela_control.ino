@@ -16,34 +16,40 @@ const int openAngle = 90;    // Ângulo para cancela aberta (90 graus)
 const int minPulse = 500;
 const int maxPulse = 2500;
 
+// Protocolo binário: um byte por comando (deve coincidir com arduino_controller.py)
+const byte CMD_ABRIR = 0x01;
+const byte CMD_FECHAR = 0x02;
+const byte CMD_PING = 0x00;
+const byte READY = 'R'; // Sinal de pronto, aguardado pelo connect() do lado Python
+
 Servo gateServo; // Cria um objeto servo
 
 void setup() {
   // Anexa o servo ao pino e aplica a calibração de pulso
   gateServo.attach(servoPin, minPulse, maxPulse);
   
-  // Inicia a comunicação serial a 9600 bits por segundo
-  Serial.begin(9600);
+  // Inicia a comunicação serial a 115200 bits por segundo
+  Serial.begin(115200);
   
   // Garante que a cancela comece fechada
   gateServo.write(closedAngle);
+  Serial.write(READY);
   Serial.println("Cancela inicializada: FECHADA");
 }
 
 void loop() {
   if (Serial.available() > 0) {
-    String command = Serial.readStringUntil('\n');
-    command.trim();
-    
-    Serial.print("Comando recebido: ");
-    Serial.println(command);
+    // Lê um único byte: sem esperar por '\n' nem montar String
+    int command = Serial.read();
 
-    if (command == "ABRIR") {
+    if (command == CMD_ABRIR) {
       gateServo.write(openAngle);
       Serial.println("Cancela: ABERTA");
-    } else if (command == "FECHAR") {
+    } else if (command == CMD_FECHAR) {
       gateServo.write(closedAngle);
       Serial.println("Cancela: FECHADA");
+    } else if (command == CMD_PING) {
+      Serial.write(READY);
     } else {
       Serial.println("Comando inválido.");
     }
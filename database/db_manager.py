@@ -5,26 +5,137 @@ Módulo de gerenciamento do banco de dados SQLite para o sistema de cancela.
 
 import sqlite3
 import os
+import time
+import queue
+import threading
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Iterator
 
 class DatabaseManager:
     """Classe para gerenciar operações do banco de dados."""
     
-    def __init__(self, db_path: Optional[str] = None):
+    def __init__(self, db_path: Optional[str] = None, pool_size: int = 4):
         if db_path is None:
             db_path = os.path.join(os.path.dirname(__file__), 'cancela.db')
         self.db_path = db_path
         self._ensure_database_exists()
+        self._ensure_indexes()
+        # Pool de conexões reaproveitadas entre chamadas (e entre threads, uma por vez)
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        for _ in range(pool_size):
+            self._pool.put(self._connect())
+        # Conexão fixada na thread atual (ver fixar_conexao), usada no lugar do pool
+        self._local = threading.local()
+        # Última listagem de placas, com a assinatura da tabela no momento da leitura
+        self._placas_lock = threading.RLock()
+        self._placas_snapshot: Optional[tuple] = None
+        # PRAGMA optimize a cada OPTIMIZE_EVERY logs gravados (estatísticas do planejador em dia)
+        self._logs_desde_optimize = 0
     
     def _ensure_database_exists(self):
         if not os.path.exists(self.db_path):
             raise FileNotFoundError(f"Banco de dados não encontrado: {self.db_path}. Execute init_db.py")
     
-    def _get_connection(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_path)
+    def _ensure_indexes(self):
+        """
+        Cria os índices usados pelas consultas do dashboard em bancos gerados antes
+        de eles entrarem no init_db.py (sem efeito se já existirem).
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            # Bancos criados antes do WAL no init_db.py passam para WAL aqui (persistente)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_status ON placas_autorizadas(status)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_logs_day_acao ON logs_acesso(timestamp, acao_cancela)')
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_placas_ordem ON placas_autorizadas(
+                    CASE status WHEN 'AUTORIZADA' THEN 1 WHEN 'NAO_AUTORIZADA' THEN 2 WHEN 'INATIVA' THEN 3 ELSE 4 END,
+                    data_cadastro DESC
+                )
+            ''')
+        conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Conexões de vida longa: o cache de statements (por conexão) evita preparar de novo
+        # o mesmo SQL a cada chamada, já que as consultas usam texto fixo e parâmetros
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=256)
         conn.row_factory = sqlite3.Row
+        # Ajustes por conexão (ao contrário do journal_mode, não ficam gravados no arquivo)
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA mmap_size=268435456')
+        conn.execute('PRAGMA cache_size=-20000')
         return conn
+
+    def checkpoint(self):
+        """
+        Copia o WAL para o banco e o trunca. O SQLite já faz checkpoints automáticos
+        (a cada ~1000 páginas), mas com leitores sempre ativos o WAL pode crescer;
+        processos de longa duração devem chamar isto periodicamente.
+        """
+        with self._get_connection() as conn:
+            conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+
+    @contextmanager
+    def _get_connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Empresta uma conexão do pool (aguardando se todas estiverem em uso).
+        Como o `with conn` do sqlite3, confirma a transação ao sair ou desfaz em caso de erro.
+        """
+        fixada = getattr(self._local, 'conn', None)
+        conn = fixada if fixada is not None else self._pool.get()
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            if fixada is None:
+                self._pool.put(conn)
+
+    OPTIMIZE_EVERY = 10_000
+
+    def close(self):
+        """
+        Atualiza as estatísticas do planejador (PRAGMA optimize) e fecha as conexões do pool.
+        """
+        conexoes = []
+        while True:
+            try:
+                conexoes.append(self._pool.get_nowait())
+            except queue.Empty:
+                break
+        for i, conn in enumerate(conexoes):
+            try:
+                if i == 0:
+                    conn.execute('PRAGMA optimize')
+                conn.close()
+            except sqlite3.Error as e:
+                print(f"Erro ao fechar conexão com o banco: {e}")
+
+    def _talvez_otimizar(self, conn: sqlite3.Connection, gravados: int):
+        self._logs_desde_optimize += gravados
+        if self._logs_desde_optimize >= self.OPTIMIZE_EVERY:
+            self._logs_desde_optimize = 0
+            conn.execute('PRAGMA optimize')
+
+    def fixar_conexao(self) -> sqlite3.Connection:
+        """
+        Retira uma conexão do pool e a fixa na thread atual: até liberar_conexao,
+        todas as chamadas desta thread usam a mesma conexão (ex.: uma requisição web).
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._pool.get()
+        return conn
+
+    def liberar_conexao(self):
+        """Desfaz fixar_conexao, devolvendo a conexão ao pool."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            self._local.conn = None
+            self._pool.put(conn)
     
     def verificar_placa_autorizada(self, placa: str) -> Dict[str, any]:
         placa = placa.upper().strip()
@@ -33,43 +144,91 @@ class DatabaseManager:
             cursor.execute('SELECT * FROM placas_autorizadas WHERE placa = ?', (placa,))
             resultado = cursor.fetchone()
             if resultado:
-                dados = dict(resultado)
-                autorizada = dados['status'] == 'AUTORIZADA'
+                status = resultado['status']
                 return {
-                    'autorizada': autorizada,
-                    'status': dados['status'],
-                    'dados': dict(dados)
+                    'autorizada': status == 'AUTORIZADA',
+                    'status': status,
+                    'dados': dict(resultado)
                 }
             else:
                 return {'autorizada': False, 'status': 'NAO_ENCONTRADA', 'dados': None}
     
-    def registrar_log_acesso(self, placa: str, status_validacao: str, 
-                           acao_cancela: str, confianca_ocr: Optional[float] = None,
-                           observacoes: Optional[str] = None) -> int:
+    def registrar_logs_acesso(self, registros: List[tuple]) -> int:
+        """
+        Insere vários logs de acesso em uma única transação.
+
+        Cada registro é (id, placa, status_validacao, acao_cancela, confianca_ocr, observacoes,
+        timestamp), com o id já gerado pelo chamador e timestamp em segundos desde a epoch
+        (gravado em UTC, como o CURRENT_TIMESTAMP).
+        """
+        if not registros:
+            return 0
         with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO logs_acesso (placa, status_validacao, acao_cancela, confianca_ocr, observacoes)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (placa.upper().strip(), status_validacao, acao_cancela, confianca_ocr, observacoes))
+            conn.executemany('''
+                INSERT INTO logs_acesso (id, placa, status_validacao, acao_cancela, confianca_ocr, observacoes, timestamp)
+                VALUES (?, ?, ?, ?, ?, ?, datetime(?, 'unixepoch'))
+            ''', registros)
             conn.commit()
-            return cursor.lastrowid
+            self._talvez_otimizar(conn, len(registros))
+            return len(registros)
     
     def listar_todas_as_placas(self) -> List[Dict]:
+        """
+        Lista todas as placas (ordenadas por status e cadastro) a partir de uma cópia em
+        memória, refeita só quando a assinatura da tabela muda. Os dicts são compartilhados
+        entre chamadas: trate-os como somente leitura.
+        """
+        with self._get_connection() as conn:
+            return self._snapshot_placas(conn)
+
+    def _snapshot_placas(self, conn: sqlite3.Connection) -> List[Dict]:
+        assinatura = self._assinatura_placas(conn)
+        with self._placas_lock:
+            snapshot = self._placas_snapshot
+            if snapshot is None or snapshot[0] != assinatura:
+                snapshot = self._placas_snapshot = (assinatura, self._listar_todas_as_placas(conn))
+            return list(snapshot[1])
+
+    def _invalidar_snapshot_placas(self):
+        # Escritas deste processo no mesmo segundo não mudam MAX(data_atualizacao)
+        with self._placas_lock:
+            self._placas_snapshot = None
+
+    @staticmethod
+    def _listar_todas_as_placas(conn: sqlite3.Connection) -> List[Dict]:
+        # A ordem segue o índice de expressão idx_placas_ordem (mesmo CASE): sem etapa de ordenação
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT * FROM placas_autorizadas
+            ORDER BY 
+                CASE status
+                    WHEN 'AUTORIZADA' THEN 1
+                    WHEN 'NAO_AUTORIZADA' THEN 2
+                    WHEN 'INATIVA' THEN 3
+                    ELSE 4
+                END,
+                data_cadastro DESC
+        ''')
+        return [dict(row) for row in cursor.fetchall()]
+    
+    def listar_placas_autorizadas(self, limite: int = 100, offset: int = 0) -> List[Dict]:
+        """Lista uma página das placas com status AUTORIZADA, em ordem de cadastro."""
         with self._get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT * FROM placas_autorizadas
-                ORDER BY 
-                    CASE status
-                        WHEN 'AUTORIZADA' THEN 1
-                        WHEN 'NAO_AUTORIZADA' THEN 2
-                        WHEN 'INATIVA' THEN 3
-                        ELSE 4
-                    END,
-                    data_cadastro DESC
-            ''')
+                WHERE status = 'AUTORIZADA'
+                ORDER BY id
+                LIMIT ? OFFSET ?
+            ''', (limite, offset))
             return [dict(row) for row in cursor.fetchall()]
+
+    def contar_placas_autorizadas(self) -> int:
+        """Conta as placas com status AUTORIZADA."""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*) FROM placas_autorizadas WHERE status = 'AUTORIZADA'")
+            return cursor.fetchone()[0]
     
     def adicionar_placa(self, placa: str, status: str, veiculo_modelo: str = None,
                        veiculo_cor: str = None, cliente_nome: str = None) -> bool:
@@ -81,9 +240,47 @@ class DatabaseManager:
                     VALUES (?, ?, ?, ?, ?)
                 ''', (placa.upper().strip(), status, veiculo_modelo, veiculo_cor, cliente_nome))
                 conn.commit()
-                return True
+            self._invalidar_snapshot_placas()
+            return True
         except sqlite3.IntegrityError:
             return False
+
+    def adicionar_placas_bulk(self, registros: List[tuple]) -> Dict[str, any]:
+        """
+        Insere várias placas em uma única transação (um commit para o lote inteiro).
+
+        Cada registro é (placa, status, veiculo_modelo, veiculo_cor, cliente_nome).
+        Placas já cadastradas ou repetidas no lote não são inseridas e voltam em 'duplicates'.
+        """
+        novos, duplicadas, vistas = [], [], set()
+        for registro in registros:
+            placa = registro[0].upper().strip()
+            if placa in vistas:
+                duplicadas.append(placa)
+                continue
+            vistas.add(placa)
+            novos.append((placa,) + tuple(registro[1:]))
+        if not novos:
+            return {'inserted': 0, 'duplicates': duplicadas}
+
+        with self._get_connection() as conn:
+            # IMMEDIATE: nenhuma outra conexão grava entre a checagem e o INSERT
+            conn.execute('BEGIN IMMEDIATE')
+            existentes = set()
+            placas = [r[0] for r in novos]
+            for i in range(0, len(placas), 500):  # Abaixo do limite de parâmetros do SQLite
+                lote = placas[i:i + 500]
+                existentes.update(row[0] for row in conn.execute(
+                    f"SELECT placa FROM placas_autorizadas WHERE placa IN ({','.join('?' * len(lote))})", lote))
+            if existentes:
+                duplicadas.extend(r[0] for r in novos if r[0] in existentes)
+                novos = [r for r in novos if r[0] not in existentes]
+            conn.executemany('''
+                INSERT INTO placas_autorizadas (placa, status, veiculo_modelo, veiculo_cor, cliente_nome)
+                VALUES (?, ?, ?, ?, ?)
+            ''', novos)
+        self._invalidar_snapshot_placas()
+        return {'inserted': len(novos), 'duplicates': duplicadas}
     
     def atualizar_placa(self, placa: str, status: str, veiculo_modelo: str, veiculo_cor: str, cliente_nome: str) -> bool:
         """Atualiza os dados de uma placa existente."""
@@ -96,11 +293,29 @@ class DatabaseManager:
                     WHERE placa = ?
                 ''', (status, veiculo_modelo, veiculo_cor, cliente_nome, placa))
                 conn.commit()
-                return cursor.rowcount > 0
+            self._invalidar_snapshot_placas()
+            return cursor.rowcount > 0
         except Exception as e:
             print(f"Erro ao atualizar placa: {e}")
             return False
 
+    def atualizar_status_placa(self, placa: str, status: str) -> bool:
+        """Altera só o status de uma placa existente (usado pela API)."""
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    UPDATE placas_autorizadas
+                    SET status = ?, data_atualizacao = CURRENT_TIMESTAMP
+                    WHERE placa = ?
+                ''', (status, placa.upper().strip()))
+                conn.commit()
+            self._invalidar_snapshot_placas()
+            return cursor.rowcount > 0
+        except Exception as e:
+            print(f"Erro ao atualizar status da placa: {e}")
+            return False
+
     def desativar_placa(self, placa: str) -> bool:
         """Marca uma placa como INATIVA (soft delete)."""
         try:
@@ -112,32 +327,127 @@ class DatabaseManager:
                     WHERE placa = ?
                 ''', (placa,))
                 conn.commit()
-                return cursor.rowcount > 0
+            self._invalidar_snapshot_placas()
+            return cursor.rowcount > 0
         except Exception as e:
             print(f"Erro ao desativar placa: {e}")
             return False
 
-    def obter_logs_recentes(self, limite: int = 50) -> List[Dict]:
+    def obter_logs_recentes(self, limite: int = 50, antes_de_id: Optional[int] = None) -> List[Dict]:
+        """
+        Retorna os logs mais recentes (por id, via chave primária).
+        Com antes_de_id, retorna a página seguinte à que terminou nesse id.
+        """
         with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT * FROM logs_acesso ORDER BY timestamp DESC LIMIT ?', (limite,))
-            return [dict(row) for row in cursor.fetchall()]
+            return [dict(row) for row in conn.execute(*self._consulta_logs(limite, antes_de_id))]
+
+    @staticmethod
+    def _consulta_logs(limite: int, antes_de_id: Optional[int]) -> tuple:
+        if antes_de_id is None:
+            return 'SELECT * FROM logs_acesso ORDER BY id DESC LIMIT ?', (limite,)
+        return 'SELECT * FROM logs_acesso WHERE id < ? ORDER BY id DESC LIMIT ?', (antes_de_id, limite)
+
+    def iter_logs(self, limite: int = 50, antes_de_id: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Versão em gerador de obter_logs_recentes: entrega os logs direto do cursor,
+        sem montar a lista inteira. A conexão só é fechada ao fim da iteração.
+        """
+        # O gerador pode ser consumido por threads diferentes (ex.: StreamingResponse),
+        # mas sempre por uma de cada vez
+        conn = self._connect()
+        try:
+            for row in conn.execute(*self._consulta_logs(limite, antes_de_id)):
+                yield dict(row)
+        finally:
+            conn.close()
     
+    @staticmethod
+    def _assinatura_logs(conn: sqlite3.Connection) -> Optional[int]:
+        """Último id de log (busca direta na chave primária)."""
+        return conn.execute('SELECT MAX(id) FROM logs_acesso').fetchone()[0]
+
+    @staticmethod
+    def _assinatura_placas(conn: sqlite3.Connection) -> tuple:
+        """
+        Total de placas, total de autorizadas e última atualização: muda a cada inclusão ou
+        edição. data_atualizacao tem resolução de segundos, então duas edições no mesmo
+        segundo não a alteram; o total de autorizadas garante que uma liberação ou revogação
+        sempre muda a assinatura.
+        """
+        return tuple(conn.execute(
+            "SELECT COUNT(*), SUM(status = 'AUTORIZADA'), MAX(data_atualizacao) FROM placas_autorizadas"
+        ).fetchone())
+
+    def obter_assinaturas(self) -> Dict[str, any]:
+        """Assinaturas baratas do conteúdo, para validação de cache (ETag)."""
+        with self._get_connection() as conn:
+            return {'logs': self._assinatura_logs(conn), 'placas': self._assinatura_placas(conn)}
+
+    def observar_mudancas(self, intervalo: float = 1.0) -> Iterator[Dict[str, bool]]:
+        """
+        Gerador que acompanha escritas feitas por outras conexões (API, dashboard).
+        A cada intervalo consulta PRAGMA data_version, que não lê nenhuma tabela, e só
+        quando ele muda verifica o que mudou. Produz {'logs': bool, 'placas': bool}
+        a cada intervalo (ambos False se nada mudou), para que o consumidor possa
+        enviar keep-alives e perceber desconexões.
+        """
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        try:
+            def assinaturas():
+                return self._assinatura_logs(conn), self._assinatura_placas(conn)
+
+            versao = conn.execute('PRAGMA data_version').fetchone()[0]
+            logs, placas = assinaturas()
+            while True:
+                time.sleep(intervalo)
+                nova_versao = conn.execute('PRAGMA data_version').fetchone()[0]
+                if nova_versao == versao:
+                    yield {'logs': False, 'placas': False}
+                    continue
+                versao = nova_versao
+                novos_logs, novas_placas = assinaturas()
+                yield {'logs': novos_logs != logs, 'placas': novas_placas != placas}
+                logs, placas = novos_logs, novas_placas
+        finally:
+            conn.close()
+
     def obter_estatisticas(self) -> Dict[str, any]:
         with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT COUNT(*) FROM placas_autorizadas WHERE status = "AUTORIZADA"')
-            total_autorizadas = cursor.fetchone()[0]
-            cursor.execute('SELECT COUNT(*) FROM placas_autorizadas WHERE status = "NAO_AUTORIZADA"')
-            total_nao_autorizadas = cursor.fetchone()[0]
-            cursor.execute("SELECT COUNT(*) FROM logs_acesso WHERE DATE(timestamp) = DATE('now', 'localtime')")
-            acessos_hoje = cursor.fetchone()[0]
-            # --- CORREÇÃO DO ERRO DE DIGITAÇÃO AQUI ---
-            cursor.execute("SELECT COUNT(*) FROM logs_acesso WHERE DATE(timestamp) = DATE('now', 'localtime') AND acao_cancela = 'ABERTA'")
-            acessos_autorizados_hoje = cursor.fetchone()[0]
+            return self._estatisticas(conn)
+
+    @staticmethod
+    def _estatisticas(conn: sqlite3.Connection) -> Dict[str, any]:
+        # Uma consulta: uma passada em placas_autorizadas e, em logs_acesso, só a faixa
+        # do dia (intervalo em timestamp, coberto por idx_logs_day_acao, no lugar de DATE() por linha)
+        autorizadas, nao_autorizadas, acessos_hoje, acessos_autorizados_hoje = conn.execute('''
+            SELECT p.autorizadas, p.nao_autorizadas, l.acessos, l.abertas
+            FROM (
+                SELECT COALESCE(SUM(status = 'AUTORIZADA'), 0) AS autorizadas,
+                       COALESCE(SUM(status = 'NAO_AUTORIZADA'), 0) AS nao_autorizadas
+                FROM placas_autorizadas
+            ) AS p, (
+                SELECT COUNT(*) AS acessos, COALESCE(SUM(acao_cancela = 'ABERTA'), 0) AS abertas
+                FROM logs_acesso
+                WHERE timestamp >= DATE('now', 'localtime') AND timestamp < DATE('now', 'localtime', '+1 day')
+            ) AS l
+        ''').fetchone()
+        return {
+            'total_placas_autorizadas': autorizadas,
+            'total_placas_nao_autorizadas': nao_autorizadas,
+            'acessos_hoje': acessos_hoje,
+            'taxa_autorizacao_hoje': (acessos_autorizados_hoje / acessos_hoje * 100) if acessos_hoje > 0 else 0
+        }
+
+    def obter_dashboard(self, limite_logs: int = 20) -> Dict[str, any]:
+        """
+        Estatísticas, logs recentes e placas em uma só conexão e transação de leitura,
+        garantindo que as três partes venham do mesmo estado do banco.
+        """
+        with self._get_connection() as conn:
+            conn.execute('BEGIN')
+            logs = conn.execute('SELECT * FROM logs_acesso ORDER BY id DESC LIMIT ?', (limite_logs,)).fetchall()
             return {
-                'total_placas_autorizadas': total_autorizadas,
-                'total_placas_nao_autorizadas': total_nao_autorizadas,
-                'acessos_hoje': acessos_hoje,
-                'taxa_autorizacao_hoje': (acessos_autorizados_hoje / acessos_hoje * 100) if acessos_hoje > 0 else 0
+                'stats': self._estatisticas(conn),
+                'logs': [dict(row) for row in logs],
+                'placas': self._snapshot_placas(conn)
             }
\ No newline at end of file
@@ -19,6 +19,10 @@ def create_database():
         print(f"Banco de dados antigo removido em: {db_path}")
     
     conn = sqlite3.connect(db_path)
+    # WAL: leituras (checagem de placas) não bloqueiam a gravação de logs, e com
+    # synchronous=NORMAL o commit não espera fsync (o modo WAL fica gravado no arquivo)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
     cursor = conn.cursor()
     
     # --- CORREÇÃO 1 AQUI ---
@@ -49,7 +53,16 @@ def create_database():
     ''')
     
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_placa ON placas_autorizadas(placa)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_timestamp ON logs_acesso(timestamp)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_status ON placas_autorizadas(status)')
+    # Mesma expressão do ORDER BY de listar_todas_as_placas: a listagem sai do índice, sem ordenação
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_placas_ordem ON placas_autorizadas(
+            CASE status WHEN 'AUTORIZADA' THEN 1 WHEN 'NAO_AUTORIZADA' THEN 2 WHEN 'INATIVA' THEN 3 ELSE 4 END,
+            data_cadastro DESC
+        )
+    ''')
+    # Cobre a faixa do dia com a ação: as estatísticas de hoje não leem a tabela de logs
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_logs_day_acao ON logs_acesso(timestamp, acao_cancela)')
     
     conn.commit()
     print(f"Novo banco de dados criado com sucesso em: {db_path}")
@@ -84,23 +97,22 @@ def insert_sample_data(cursor):
         ('BCD8520', 'NAO_AUTORIZADA', 'Peugeot 208', 'Preto', 'Juliana Martins')
     ]
     
-    for placa, status, modelo, cor, cliente in placas_exemplo:
-        try:
-            cursor.execute('''
-                INSERT INTO placas_autorizadas 
-                (placa, status, veiculo_modelo, veiculo_cor, cliente_nome)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (placa, status, modelo, cor, cliente))
-        except sqlite3.IntegrityError:
-            print(f"Placa {placa} já existe no banco de dados.")
+    # Um único executemany na transação aberta (confirmada em main); duplicatas são ignoradas
+    cursor.executemany('''
+        INSERT OR IGNORE INTO placas_autorizadas 
+        (placa, status, veiculo_modelo, veiculo_cor, cliente_nome)
+        VALUES (?, ?, ?, ?, ?)
+    ''', placas_exemplo)
     
-    print(f"Inseridos {len(placas_exemplo)} registros de exemplo.")
+    print(f"Inseridos {cursor.rowcount} registros de exemplo.")
 
 def main():
     print("Inicializando banco de dados do sistema de cancela...")
     conn, cursor = create_database()
     insert_sample_data(cursor)
     conn.commit()
+    # Estatísticas para o planejador escolher os índices acima
+    conn.execute('ANALYZE')
     conn.close()
     print("Inicialização do banco de dados concluída com sucesso!")
 
@@ -9,46 +9,203 @@ Módulo para captura de imagem da webcam, detecção de placas e integração co
 import cv2
 import numpy as np
 from typing import Optional, Tuple, Dict, Any
+import os
+import sys
 import time
+import functools
 import argparse
+import threading
+import queue
 
 # Importa o motor OCR
-from ocr.ocr_engine import OCREngine
+from ocr.ocr_engine import OCREngine, parece_ter_texto
+
+CASCADE_FILE = 'haarcascade_russian_plate_number.xml'
+
+
+def _resolve_cascade_path() -> str:
+    """
+    Caminho do classificador: o XML do diretório atual, se existir, ou o que acompanha o OpenCV.
+    """
+    if os.path.exists(CASCADE_FILE):
+        return CASCADE_FILE
+    return os.path.join(cv2.data.haarcascades, CASCADE_FILE)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_plate_cascade(path: str) -> cv2.CascadeClassifier:
+    """
+    Carrega o XML do cascade uma única vez por caminho; as instâncias compartilham o classificador.
+    Aceita cascades Haar ou LBP (o LBP avalia cada janela com inteiros, cerca de 2x mais rápido).
+    """
+    return cv2.CascadeClassifier(path)
+
 
 class ImageCaptureProcessor:
     """Classe para capturar imagens, detectar placas e processá-las com OCR."""
     
-    def __init__(self, camera_index: int = 0, ocr_engine: Optional[OCREngine] = None):
+    def __init__(self, camera_index: int = 0, ocr_engine: Optional[OCREngine] = None,
+                 detector_model: Optional[str] = None, cascade_file: Optional[str] = None):
         """
         Inicializa o processador de captura de imagem.
+        
+        Args:
+            detector_model: Modelo ONNX de detecção de placas (saída no formato YOLOv5),
+                            executado pelo OpenCV DNN no lugar do Haar cascade.
+            cascade_file: XML do cascade (ex.: um cascade LBP de placas). Padrão: o Haar do projeto.
         """
         self.camera_index = camera_index
         self.cap = None
         self.ocr_engine = ocr_engine if ocr_engine else OCREngine()
+        # Captura em thread própria (opcional): guarda só o frame mais recente
+        self._frames: "queue.Queue[np.ndarray]" = queue.Queue(maxsize=1)
+        self._frame_wanted = threading.Event()  # Consumidor aguardando: decodificar o próximo frame
+        self._capture_thread: Optional[threading.Thread] = None
+        self._capture_stop = threading.Event()
+        # Detecção + OCR em thread própria (opcional): a UI consome os frames já anotados
+        self._results: "queue.Queue[Tuple[np.ndarray, Optional[Dict[str, Any]]]]" = queue.Queue(maxsize=2)
+        self._processing_thread: Optional[threading.Thread] = None
+        self._processing_stop = threading.Event()
+        # OCR em uma terceira thread: a detecção não espera o OCR (fila com as candidatas mais recentes)
+        self._ocr_jobs: "queue.Queue[list]" = queue.Queue(maxsize=2)
+        self._ocr_thread: Optional[threading.Thread] = None
+        self._result_lock = threading.Lock()  # _last_result/_last_bbox, escritos pela thread de OCR
+        # Cache por hash do frame (dHash 64 bits): cena praticamente igual reaproveita o último resultado
+        self.frame_reuse_window = 5.0  # Segundos
+        self.frame_hash_threshold = 6  # Bits diferentes tolerados
+        self._last_hash: Optional[int] = None
+        self._last_result: Optional[Dict[str, Any]] = None
+        self._last_bbox = None
+        self._last_t = 0.0
+        self._gray: Optional[np.ndarray] = None  # Buffer reaproveitado entre frames
+        # O cascade roda em resolução reduzida (custo proporcional ao número de pixels)
+        self.detection_scale = 0.5  # 1280x720 -> 640x360
+        # Gate de movimento: sem diferença entre frames consecutivos, não há detecção nova
+        self.motion_pixel_threshold = 25  # Diferença mínima de intensidade por pixel
+        self.motion_min_ratio = 0.005     # Fração mínima de pixels alterados
+        self._small: Optional[np.ndarray] = None
+        self._prev_small: Optional[np.ndarray] = None
+        self._small_size = None
+        self._prev_small_size = None
+        # Parâmetros do cascade especializados para a resolução de detecção (ver _cascade_params)
+        self._det_size = None
+        self._det_kwargs: Dict[str, Any] = {}
+        # OpenCL (T-API): com GPU disponível, cinza/redução/cascade rodam nela via UMat.
+        # Só o dHash (9x8) volta para a CPU; o desenho e o OCR usam o frame original.
+        self.use_opencl = cv2.ocl.haveOpenCL()
+        cv2.ocl.setUseOpenCL(self.use_opencl)
+        self._diff: Optional[np.ndarray] = None
+        # OCR só nas melhores caixas: proporção próxima da placa brasileira (~3:1), maiores primeiro
+        self.plate_aspect = 3.0
+        self.plate_aspect_tolerance = 0.8
+        self.max_ocr_candidates = 2
+        self.ocr_roi_size = (240, 80)    # Escala fixa para o OCR (largura, altura)
+        # Faixa vertical do frame onde o cascade procura placas (frações da altura): com a câmera
+        # fixa, céu e topo do veículo nunca têm placa. (0.0, 1.0) procura no frame inteiro.
+        self.detection_band = (0.3, 0.9)
+        self.ocr_early_exit = 0.9        # Confiança que dispensa as demais candidatas
+        # Buffer da ROI redimensionada, reaproveitado entre candidatas e frames (o OCR é síncrono)
+        self._roi_buf = np.empty((self.ocr_roi_size[1], self.ocr_roi_size[0], 3), dtype=np.uint8)
+        self._roi_gray: Optional[np.ndarray] = None  # Cinza da ROI, só para o filtro de texto
         
-        cascade_path = 'haarcascade_russian_plate_number.xml'
-        if not cv2.os.path.exists(cascade_path):
-             cascade_path = cv2.data.haarcascades + 'haarcascade_russian_plate_number.xml'
+        # Detector DNN (opcional): menos falsos positivos que o cascade, logo menos ROIs no OCR
+        self.plate_net = None
+        self.detector_input_size = 416
+        self.detector_conf = 0.4
+        self.detector_nms = 0.45
+        if detector_model:
+            self.plate_net = self._load_detector(detector_model)
 
-        self.plate_cascade = cv2.CascadeClassifier(cascade_path)
+        cascade_path = cascade_file or _resolve_cascade_path()
+        self.plate_cascade = _load_plate_cascade(cascade_path)
         
-        if self.plate_cascade.empty():
+        if self.plate_net is None and self.plate_cascade.empty():
             print(f"ERRO: Não foi possível carregar o classificador de placas em: {cascade_path}")
             raise FileNotFoundError("Classificador de placas não encontrado.")
         
         print(f"ImageCaptureProcessor inicializado para câmera {self.camera_index}.")
         self._initialize_camera()
 
+    @staticmethod
+    def _load_detector(model_path: str):
+        """
+        Carrega o detector ONNX, usando CUDA em FP16 quando houver GPU disponível.
+        Retorna None (mantendo o Haar cascade) se o modelo não puder ser carregado.
+        """
+        try:
+            net = cv2.dnn.readNetFromONNX(model_path)
+        except cv2.error as e:
+            print(f"ERRO: Não foi possível carregar o detector {model_path}: {e}. Usando o Haar cascade.")
+            return None
+        try:
+            if cv2.cuda.getCudaEnabledDeviceCount() > 0:
+                net.setPreferableBackend(cv2.dnn.DNN_BACKEND_CUDA)
+                net.setPreferableTarget(cv2.dnn.DNN_TARGET_CUDA_FP16)
+                print("Detector de placas DNN rodando em CUDA (FP16).")
+                return net
+        except (AttributeError, cv2.error):
+            pass
+        print("Detector de placas DNN rodando em CPU.")
+        return net
+
+    def _detect_plates_dnn(self, frame: np.ndarray) -> list:
+        """
+        Detecta placas com o modelo ONNX e retorna as caixas (x, y, w, h) no frame original.
+        """
+        fh, fw = frame.shape[:2]
+        size = self.detector_input_size
+        blob = cv2.dnn.blobFromImage(frame, 1 / 255.0, (size, size), swapRB=True, crop=False)
+        self.plate_net.setInput(blob)
+        out = self.plate_net.forward()[0]  # (N, 5 + classes): cx, cy, w, h, objectness, ...
+        scores = out[:, 4] * out[:, 5:].max(axis=1) if out.shape[1] > 5 else out[:, 4]
+        keep = scores >= self.detector_conf
+        if not keep.any():
+            return []
+        out, scores = out[keep], scores[keep]
+        sx, sy = fw / size, fh / size
+        w, h = out[:, 2] * sx, out[:, 3] * sy
+        x, y = out[:, 0] * sx - w / 2, out[:, 1] * sy - h / 2
+        boxes = np.stack([x, y, w, h], axis=1).round().astype(int).tolist()
+        indices = cv2.dnn.NMSBoxes(boxes, scores.tolist(), self.detector_conf, self.detector_nms)
+        plates = []
+        for i in np.array(indices).flatten():
+            bx, by, bw, bh = boxes[i]
+            bx, by = max(bx, 0), max(by, 0)
+            plates.append((bx, by, min(bw, fw - bx), min(bh, fh - by)))
+        return plates
+
+    @staticmethod
+    def _cascade_params(size: Tuple[int, int]) -> Dict[str, Any]:
+        """
+        Parâmetros do detectMultiScale para a resolução de detecção. Com a câmera fixa,
+        as placas ocupam uma faixa estreita de tamanhos: limitar minSize/maxSize a essa
+        faixa e usar scaleFactor maior reduz o número de escalas da pirâmide.
+        """
+        w, h = size
+        return dict(
+            scaleFactor=1.15,
+            minNeighbors=4,
+            minSize=(int(w * 0.04), int(h * 0.02)),
+            maxSize=(int(w * 0.4), int(h * 0.2)),
+        )
+
     def _initialize_camera(self) -> bool:
         """
         Inicializa a câmera.
         """
         if self.cap is None or not self.cap.isOpened():
-            self.cap = cv2.VideoCapture(self.camera_index)
+            # No Linux, o CAP_PROP_BUFFERSIZE só é respeitado pelo backend V4L2
+            self.cap = None
+            if sys.platform.startswith("linux"):
+                self.cap = cv2.VideoCapture(self.camera_index, cv2.CAP_V4L2)
+            if self.cap is None or not self.cap.isOpened():
+                self.cap = cv2.VideoCapture(self.camera_index)
             if not self.cap.isOpened():
                 print(f"ERRO: Não foi possível abrir a câmera com índice {self.camera_index}.")
                 return False
             
+            # Buffer de 1 frame no driver (antes do formato): o read() devolve o frame atual, não um acumulado
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
             self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
             self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
             self.cap.set(cv2.CAP_PROP_FPS, 30)
@@ -59,43 +216,260 @@ class ImageCaptureProcessor:
         """
         Libera os recursos da câmera.
         """
+        self.stop_processing_thread()
+        self.stop_capture_thread()
         if self.cap and self.cap.isOpened():
             self.cap.release()
             print(f"Câmera {self.camera_index} liberada.")
         self.cap = None
 
-    def capture_and_process_frame(self) -> Tuple[Optional[np.ndarray], Optional[Dict[str, Any]]]:
+    def start_capture_thread(self) -> bool:
         """
-        Captura um frame, detecta placas, desenha na imagem e realiza OCR.
+        Inicia a leitura da câmera em uma thread produtora. A leitura do OpenCV libera
+        o GIL, então a entrega de frames pelo driver se sobrepõe ao processamento.
+        """
+        if self._capture_thread and self._capture_thread.is_alive():
+            return True
+        if not self._initialize_camera():
+            return False
+        self._capture_stop.clear()
+        self._capture_thread = threading.Thread(target=self._capture_worker, name="camera-capture", daemon=True)
+        self._capture_thread.start()
+        return True
+
+    def stop_capture_thread(self):
+        """
+        Para a thread de captura, se estiver ativa.
+        """
+        if self._capture_thread is None:
+            return
+        self._capture_stop.set()
+        if self._capture_thread is not threading.current_thread():
+            self._capture_thread.join(timeout=2)
+        self._capture_thread = None
+
+    def _capture_worker(self):
+        """
+        Esvazia o buffer do driver com grab() contínuo e só decodifica (retrieve) quando
+        o consumidor pede um frame. Frames que ninguém vai usar não são decodificados.
+        Só esta thread acessa self.cap, então não há lock em torno da câmera.
+        """
+        while not self._capture_stop.is_set():
+            if not self.cap.grab():
+                time.sleep(0.01)
+                continue
+            if not self._frame_wanted.is_set():
+                continue
+            ret, frame = self.cap.retrieve()
+            if ret:
+                self._frame_wanted.clear()
+                self._put_latest(self._frames, frame)
+
+    @staticmethod
+    def _put_latest(q: queue.Queue, item):
+        """
+        Enfileira sem bloquear; se o consumidor está atrasado, descarta o item mais antigo.
+        """
+        try:
+            q.put_nowait(item)
+        except queue.Full:
+            try:
+                q.get_nowait()
+            except queue.Empty:
+                pass
+            q.put_nowait(item)
+
+    def start_processing_thread(self, num_threads: Optional[int] = None) -> bool:
+        """
+        Inicia a detecção e o OCR em threads próprias (captura -> detecção -> OCR), consumindo
+        os frames da thread de captura. O cascade e o OCR liberam o GIL, então rodam em
+        paralelo entre si e com a UI; a detecção segue no ritmo da câmera mesmo com o OCR lento.
+        
+        Args:
+            num_threads: Threads internas do OpenCV para o detectMultiScale (padrão: núcleos disponíveis).
+        """
+        if self._processing_thread and self._processing_thread.is_alive():
+            return True
+        if not self.start_capture_thread():
+            return False
+        cv2.setNumThreads(num_threads or os.cpu_count() or 1)
+        self._processing_stop.clear()
+        self._ocr_thread = threading.Thread(target=self._ocr_worker, name="plate-ocr", daemon=True)
+        self._ocr_thread.start()
+        self._processing_thread = threading.Thread(target=self._processing_worker, name="plate-detection", daemon=True)
+        self._processing_thread.start()
+        return True
+
+    def stop_processing_thread(self):
+        """
+        Para as threads de detecção e de OCR, se estiverem ativas.
+        """
+        if self._processing_thread is None:
+            return
+        self._processing_stop.set()
+        for thread in (self._processing_thread, self._ocr_thread):
+            if thread is not None and thread is not threading.current_thread():
+                thread.join(timeout=2)
+        self._processing_thread = None
+        self._ocr_thread = None
+
+    def _processing_worker(self):
+        """
+        Processa continuamente o frame mais recente, mantendo na fila os últimos resultados.
         """
+        while not self._processing_stop.is_set():
+            try:
+                frame, plate_info = self.capture_and_process_frame()
+            except Exception as e:
+                print(f"ERRO no processamento do frame: {e}")
+                time.sleep(0.1)
+                continue
+            if frame is not None:
+                self._put_latest(self._results, (frame, plate_info))
+
+    def read_processed(self, timeout: float = 0.05) -> Tuple[Optional[np.ndarray], Optional[Dict[str, Any]]]:
+        """
+        Retorna o próximo frame anotado e a placa detectada pela thread de detecção,
+        ou (None, None) se nenhum ficou pronto dentro do timeout.
+        """
+        try:
+            return self._results.get(timeout=timeout)
+        except queue.Empty:
+            return None, None
+
+    def read_frame(self) -> Optional[np.ndarray]:
+        """
+        Retorna o próximo frame: da thread de captura, se ativa, ou direto da câmera.
+        """
+        if self._capture_thread is not None:
+            # Descarta um frame que sobrou de uma espera anterior: queremos o próximo grab
+            try:
+                self._frames.get_nowait()
+            except queue.Empty:
+                pass
+            self._frame_wanted.set()
+            try:
+                return self._frames.get(timeout=1.0)
+            except queue.Empty:
+                return None
+
         if not self.cap or not self.cap.isOpened():
             if not self._initialize_camera():
-                return None, None
-
+                return None
         ret, frame = self.cap.read()
-        if not ret:
+        return frame if ret else None
+
+    @staticmethod
+    def frame_dhash(gray) -> int:
+        """
+        Calcula o dHash de 64 bits do frame: reduz para 9x8 e compara pixels vizinhos.
+        Aceita np.ndarray ou cv2.UMat (só os 72 pixels reduzidos são copiados da GPU).
+        """
+        small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+        if isinstance(small, cv2.UMat):
+            small = small.get()
+        bits = small[:, 1:] > small[:, :-1]
+        return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+    def capture_and_process_frame(self) -> Tuple[Optional[np.ndarray], Optional[Dict[str, Any]]]:
+        """
+        Captura um frame, detecta placas, desenha na imagem e realiza OCR.
+        
+        Com a thread de OCR ativa (start_processing_thread), a detecção só enfileira as
+        candidatas e o frame sai anotado com o último OCR concluído, sem esperar pelo atual.
+        """
+        frame = self.read_frame()
+        if frame is None:
             print("ERRO: Não foi possível ler o frame da câmera.")
             return None, None
 
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        gray = cv2.equalizeHist(gray)
-
-        # Removi o 'maxSize' para detectar placas grandes (de perto)
-        # e diminui 'minNeighbors' para deixar a detecção mais flexível.
-        plates = self.plate_cascade.detectMultiScale(
-            gray, 
-            scaleFactor=1.1, 
-            minNeighbors=4,     # <-- Alterado de 5 para 4
-            minSize=(50, 20)
-            # maxSize foi removido
-        )
+        candidatas = self._detectar_candidatas(frame)
+        if candidatas is not None:
+            if not candidatas:
+                self._set_result(None, None)
+            elif self._ocr_thread is not None:
+                # Cópias só das ROIs: o frame é anotado (e reaproveitado) antes de o OCR terminar
+                self._put_latest(self._ocr_jobs, [(b, frame[b[1]:b[1]+b[3], b[0]:b[0]+b[2]].copy())
+                                                  for b in candidatas])
+            else:
+                self._set_result(*self._ler_placas(
+                    [(b, frame[b[1]:b[1]+b[3], b[0]:b[0]+b[2]]) for b in candidatas]))
+
+        with self._result_lock:
+            plate_info, bbox = self._last_result, self._last_bbox
+        self._draw_plate(frame, bbox, plate_info)
+        return frame, plate_info
 
+    def _set_result(self, plate_info: Optional[Dict[str, Any]], bbox):
+        with self._result_lock:
+            self._last_result, self._last_bbox = plate_info, bbox
+
+    def _detectar_candidatas(self, frame: np.ndarray) -> Optional[list]:
+        """
+        Pré-processa o frame e detecta as caixas candidatas a placa, já filtradas e ordenadas.
+        
+        Returns:
+            As melhores caixas (x, y, w, h) para o OCR, ou None se a cena não mudou e o
+            último resultado deve ser reaproveitado.
+        """
+        # Pré-processamento nos mesmos buffers a cada frame (o OpenCV só realoca se o tamanho mudar).
+        # Os dois buffers reduzidos se alternam: o do frame anterior fica para o gate de movimento.
+        src = cv2.UMat(frame) if self.use_opencl else frame
+        gray = self._gray = cv2.cvtColor(src, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        scale = self.detection_scale
+        size = (int(frame.shape[1] * scale), int(frame.shape[0] * scale))
+        self._small, self._prev_small = self._prev_small, self._small
+        self._small_size, self._prev_small_size = size, self._small_size
+        # Sem equalizeHist: o cascade já normaliza a variância de cada janela avaliada
+        small = self._small = cv2.resize(gray, size, dst=self._small, interpolation=cv2.INTER_AREA)
+
+        # Cena parada (sem movimento desde o frame anterior) ou quase idêntica ao último
+        # frame processado: pula detecção e OCR, dentro da janela de reaproveitamento
+        now = time.time()
+        frame_hash = self.frame_dhash(small)
+        if self._last_hash is not None and now - self._last_t < self.frame_reuse_window:
+            parado = False
+            prev = self._prev_small
+            if prev is not None and self._prev_small_size == size:
+                diff = self._diff = cv2.absdiff(small, prev, dst=self._diff)
+                cv2.threshold(diff, self.motion_pixel_threshold, 255, cv2.THRESH_BINARY, dst=diff)
+                parado = cv2.countNonZero(diff) < self.motion_min_ratio * size[0] * size[1]
+            if parado or bin(frame_hash ^ self._last_hash).count('1') < self.frame_hash_threshold:
+                return None
+        self._last_hash, self._last_t = frame_hash, now
+
+        if self.plate_net is not None:
+            plates = self._detect_plates_dnn(frame)
+        else:
+            if self._det_size != size:
+                self._det_size, self._det_kwargs = size, self._cascade_params(size)
+            # Só a faixa configurada: menos janelas e faixas de trabalho mais uniformes entre as threads
+            y0, y1 = int(size[1] * self.detection_band[0]), int(size[1] * self.detection_band[1])
+            band = cv2.UMat(small, (y0, y1), (0, size[0])) if isinstance(small, cv2.UMat) else small[y0:y1]
+            plates = self.plate_cascade.detectMultiScale(band, **self._det_kwargs)
+            # Caixas de volta para as coordenadas do frame original
+            plates = [(int(x / scale), int((y + y0) / scale), int(w / scale), int(h / scale)) for (x, y, w, h) in plates]
+
+        candidatas = [(x, y, w, h) for (x, y, w, h) in plates
+                      if h > 0 and abs(w / h - self.plate_aspect) < self.plate_aspect_tolerance]
+        candidatas.sort(key=lambda b: b[2] * b[3], reverse=True)
+        return candidatas[:self.max_ocr_candidates]
+
+    def _ler_placas(self, candidatas: list) -> Tuple[Optional[Dict[str, Any]], Optional[tuple]]:
+        """
+        Executa o OCR nas ROIs candidatas [(bbox, roi), ...] e retorna a melhor leitura e sua caixa.
+        """
         detected_plate_info = None
         max_confidence = 0.0
         best_bbox = None
 
-        for (x, y, w, h) in plates:
-            plate_roi = frame[y:y+h, x:x+w]
+        for bbox, roi in candidatas:
+            interp = cv2.INTER_AREA if bbox[3] > self.ocr_roi_size[1] else cv2.INTER_LINEAR
+            plate_roi = cv2.resize(roi, self.ocr_roi_size, dst=self._roi_buf, interpolation=interp)
+            # Caixa sem nada que pareça texto (parede, grade, reflexo): não vale uma chamada ao OCR
+            self._roi_gray = cv2.cvtColor(plate_roi, cv2.COLOR_BGR2GRAY, dst=self._roi_gray)
+            if not parece_ter_texto(self._roi_gray):
+                continue
             ocr_result = self.ocr_engine.extract_plate_info(plate_roi)
             
             if ocr_result and ocr_result["confianca"] > max_confidence:
@@ -104,17 +478,38 @@ class ImageCaptureProcessor:
                     "placa": ocr_result["placa"],
                     "confianca": ocr_result["confianca"],
                 }
-                best_bbox = (x, y, w, h)
-        
-        if best_bbox:
-            x, y, w, h = best_bbox
+                best_bbox = bbox
+                if max_confidence >= self.ocr_early_exit:
+                    break
+
+        return detected_plate_info, best_bbox
+
+    def _ocr_worker(self):
+        """
+        Terceiro estágio: lê as placas das candidatas mais recentes enfileiradas pela detecção.
+        """
+        while not self._processing_stop.is_set():
+            try:
+                candidatas = self._ocr_jobs.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            try:
+                self._set_result(*self._ler_placas(candidatas))
+            except Exception as e:
+                print(f"ERRO no OCR das candidatas: {e}")
+
+    @staticmethod
+    def _draw_plate(frame: np.ndarray, bbox, plate_info: Optional[Dict[str, Any]]):
+        """
+        Desenha o retângulo e o texto da placa detectada no frame.
+        """
+        if bbox:
+            x, y, w, h = bbox
             cv2.rectangle(frame, (x, y), (x+w, y+h), (0, 255, 0), 2)
-            if detected_plate_info:
-                text = f"{detected_plate_info['placa']} ({detected_plate_info['confianca']:.2f})"
+            if plate_info:
+                text = f"{plate_info['placa']} ({plate_info['confianca']:.2f})"
                 cv2.putText(frame, text, (x, y-10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
 
-        return frame, detected_plate_info
-
     def __del__(self):
         """
         Garante que a câmera seja liberada quando o objeto for destruído.
@@ -2,7 +2,7 @@
 """
 LPR Engine: pipeline moderno para detecção e reconhecimento de placas.
 - Tenta usar Ultralytics YOLO para detecção de placa e EasyOCR para reconhecimento.
-- Se não estiverem disponíveis, faz fallback para Haar cascade + pytesseract.
+- Se não estiverem disponíveis, faz fallback para Haar cascade + OCREngine (EasyOCR com outro leitor).
 
 Interface:
 - class LPREngine:
@@ -12,25 +12,10 @@ Observação: este módulo tenta importar bibliotecas opcionais. Se você quiser
 instale 'ultralytics' e 'easyocr' no seu ambiente.
 """
 
-from typing import Optional, Tuple, Any
-import numpy as np
-import cv2
-
-#!/usr/bin/env python3
-"""
-LPR Engine: pipeline moderno para detecção e reconhecimento de placas.
-- Tenta usar Ultralytics YOLO para detecção de placa e EasyOCR para reconhecimento.
-- Se não estiverem disponíveis, faz fallback para Haar cascade + pytesseract.
-
-Interface:
-- class LPREngine:
-    - extract_plate_from_image(image) -> (plate_text, confidence, bbox, plate_image)
-
-Observação: este módulo tenta importar bibliotecas opcionais. Se você quiser usar o pipeline completo,
-instale 'ultralytics' e 'easyocr' no seu ambiente.
-"""
-
-from typing import Optional, Tuple
+from typing import Optional
+import functools
+import glob
+import os
 import numpy as np
 import cv2
 
@@ -49,31 +34,62 @@ except Exception:
     _HAS_EASYOCR = False
 
 # Fallbacks
-from ocr.ocr_engine import OCREngine
+from ocr.ocr_engine import OCREngine, get_reader, limpar_texto_placa, PLATE_ALLOWLIST, cuda_disponivel, parece_ter_texto
+
+
+@functools.lru_cache(maxsize=None)
+def _load_yolo(weights: str):
+    """
+    Carrega os pesos YOLO uma vez por caminho (compartilhados entre instâncias).
+    Modelos PyTorch têm Conv+BN fundidos; um modelo exportado (ex.: diretório
+    *_openvino_model gerado com export(format='openvino', int8=True)) é usado como está.
+    """
+    model = YOLO(weights)
+    if str(weights).endswith('.pt'):
+        try:
+            model.fuse()
+        except Exception as e:
+            print(f"Aviso: não foi possível fundir as camadas do YOLO: {e}")
+    return model
+
+
+@functools.lru_cache(maxsize=1)
+def _load_plate_cascade() -> cv2.CascadeClassifier:
+    """Carrega o XML do Haar cascade uma vez por processo."""
+    return cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_russian_plate_number.xml')
 
 
 class LPREngine:
-    def __init__(self, yolo_model_path: Optional[str] = None, reader_langs: Optional[list] = None, try_download: bool = False, cascade_params: dict = None):
+    # Faixa de tamanhos de placa da câmera fixa (distância típica webcam-carro). Com scaleFactor 1.2
+    # e a faixa estreita, a pirâmide tem cerca de metade das escalas de 1.1 entre 30x15 e 400x200.
+    DEFAULT_CASCADE_PARAMS = dict(scaleFactor=1.2, minNeighbors=4, minSize=(60, 25), maxSize=(220, 90))
+
+    def __init__(self, yolo_model_path: Optional[str] = None, reader_langs: Optional[list] = None, try_download: bool = False, cascade_params: dict = None,
+                 yolo_imgsz: int = 416):
         """Inicializa o LPR engine.
 
         Args:
             yolo_model_path: caminho para pesos YOLO (.pt). Se None, tentamos localizar em ./models/*.pt
             reader_langs: línguas para easyocr
             try_download: se True e ultralytics instalado, tenta usar modelo yolov8n (pode baixar pesos)
-            cascade_params: dict com keys para detectMultiScale (scaleFactor, minNeighbors, minSize, maxSize)
+            cascade_params: dict com keys para detectMultiScale (scaleFactor, minNeighbors, minSize, maxSize);
+                as ausentes vêm de DEFAULT_CASCADE_PARAMS
+            yolo_imgsz: resolução de entrada do YOLO (placas pequenas continuam cobertas pelo cascade)
         """
         # Tentar achar modelo YOLO automaticamente se não passado
         if not yolo_model_path:
-            import glob, os
             candidates = glob.glob(os.path.join(os.path.dirname(__file__), '..', 'models', '*.pt'))
             candidates = [c for c in candidates if os.path.isfile(c)]
             yolo_model_path = candidates[0] if candidates else None
 
         self.use_yolo = _HAS_YOLO and bool(yolo_model_path or try_download)
         self.yolo = None
+        self.yolo_imgsz = yolo_imgsz
+        # FP16 só na GPU; na CPU, use um modelo exportado em int8 (ex.: OpenVINO) como yolo_model_path
+        self.yolo_half = _HAS_YOLO and cuda_disponivel()
         if _HAS_YOLO and yolo_model_path:
             try:
-                self.yolo = YOLO(yolo_model_path)
+                self.yolo = _load_yolo(yolo_model_path)
             except Exception as e:
                 print(f"Falha ao carregar YOLO weights '{yolo_model_path}': {e}")
                 self.yolo = None
@@ -81,7 +97,7 @@ class LPREngine:
         elif _HAS_YOLO and try_download:
             try:
                 # Tentar usar um modelo pequeno padrão (pode baixar)
-                self.yolo = YOLO('yolov8n.pt')
+                self.yolo = _load_yolo('yolov8n.pt')
             except Exception as e:
                 print(f"Não foi possível baixar/usar yolov8n.pt automaticamente: {e}")
                 self.yolo = None
@@ -92,7 +108,7 @@ class LPREngine:
         if self.use_easyocr:
             langs = reader_langs if reader_langs else ['en']
             try:
-                self.reader = easyocr.Reader(langs, gpu=False)
+                self.reader = get_reader(tuple(langs), gpu=cuda_disponivel())
             except Exception as e:
                 print(f"EasyOCR inicialização falhou: {e}")
                 self.reader = None
@@ -102,60 +118,132 @@ class LPREngine:
         self.fallback_ocr = OCREngine()
 
         # Cascade fallback detector
-        self.cascade_params = cascade_params or {}
-        self.plate_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_russian_plate_number.xml')
+        self.cascade_params = {**self.DEFAULT_CASCADE_PARAMS, **(cascade_params or {})}
+        for key in ('minSize', 'maxSize'):
+            self.cascade_params[key] = tuple(self.cascade_params[key])
+        self.plate_cascade = _load_plate_cascade()
         if self.plate_cascade.empty():
             print("Aviso: Haar cascade de placas não carregado; detecção por cascade pode falhar.")
 
+        # Contraste local para o OCR (criado uma vez; CLAHE preserva detalhes que o equalizeHist global lava)
+        self._clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+
+        # Equalização do cascade: a iluminação da câmera fixa muda devagar, então o histograma
+        # é recalculado só a cada eq_refresh_every quadros e a LUT é reaplicada nos demais
+        self.eq_refresh_every = 15
+        self._eq_lut: Optional[np.ndarray] = None
+        self._eq_counter = 0
+
+        # Buffers reaproveitados entre chamadas (o OpenCV só realoca se o tamanho mudar)
+        self._gray: Optional[np.ndarray] = None      # Cinza do frame (cascade e recorte das ROIs)
+        self._eq: Optional[np.ndarray] = None        # Cinza equalizado do cascade
+        self._roi_tmp: Optional[np.ndarray] = None   # ROI redimensionada, antes do CLAHE
+        self._roi_batch = np.empty((0, self.OCR_ROI_SIZE[1], self.OCR_ROI_SIZE[0]), np.uint8)
+
+        # OpenCL (T-API): o pré-processamento do cascade roda na GPU com um único upload do frame
+        self.use_opencl = cv2.ocl.haveOpenCL()
+        cv2.ocl.setUseOpenCL(self.use_opencl)
+
+        self.warmup()
+
+    def warmup(self):
+        """
+        Executa uma inferência em imagens vazias para que a primeira placa real não pague
+        a criação do contexto CUDA e a inicialização preguiçosa do YOLO/EasyOCR.
+        """
+        dummy = np.zeros((64, 128, 3), np.uint8)
+        if self.yolo is not None:
+            try:
+                # Mesmos imgsz/half do uso real: outra resolução não aqueceria o mesmo caminho
+                self.yolo.predict(dummy, half=self.yolo_half, imgsz=self.yolo_imgsz, verbose=False)
+            except Exception as e:
+                print(f"Aviso: warm-up do YOLO falhou: {e}")
+        if self.reader is not None:
+            try:
+                self.reader.readtext(dummy)
+            except Exception as e:
+                print(f"Aviso: warm-up do EasyOCR falhou: {e}")
+        else:
+            self.fallback_ocr.warmup()
+
+    def _cinza(self, image: np.ndarray) -> np.ndarray:
+        """Converte o frame para cinza no buffer reaproveitado."""
+        if len(image.shape) != 3:
+            return image
+        self._gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        return self._gray
+
+    def _equalizar(self, gray):
+        """Equaliza o cinza com a LUT em cache (mesmo mapeamento do equalizeHist, recalculado periodicamente)."""
+        if self._eq_lut is None or self._eq_counter % self.eq_refresh_every == 0:
+            hist = cv2.calcHist([gray], [0], None, [256], [0, 256])
+            if isinstance(hist, cv2.UMat):
+                hist = hist.get()
+            cdf = hist.ravel().cumsum()
+            cdf_min = cdf[np.argmax(cdf > 0)]
+            escala = 255.0 / max(cdf[-1] - cdf_min, 1.0)
+            self._eq_lut = np.clip(np.rint((cdf - cdf_min) * escala), 0, 255).astype(np.uint8)
+        self._eq_counter += 1
+        if isinstance(gray, cv2.UMat):
+            return cv2.LUT(gray, self._eq_lut)
+        self._eq = cv2.LUT(gray, self._eq_lut, dst=self._eq)
+        return self._eq
+
     def detect_plate_bboxes(self, image: np.ndarray):
         h, w = image.shape[:2]
         bboxes = []
         if self.use_yolo and self.yolo:
             try:
-                results = self.yolo(image)
+                results = self.yolo.predict(image, half=self.yolo_half, imgsz=self.yolo_imgsz, verbose=False)
                 for r in results:
-                    if hasattr(r, 'boxes'):
-                        for box in r.boxes:
-                            xyxy = box.xyxy[0].cpu().numpy()
-                            x1, y1, x2, y2 = xyxy.astype(int)
-                            bx = max(0, x1); by = max(0, y1)
-                            bw = min(w, x2) - bx; bh = min(h, y2) - by
-                            if bw > 10 and bh > 10:
-                                bboxes.append((bx, by, bw, bh))
+                    if hasattr(r, 'boxes') and len(r.boxes):
+                        # Uma única cópia GPU->CPU por imagem (não uma sincronização por caixa)
+                        xyxy = r.boxes.xyxy.cpu().numpy().astype(int)
+                        x1 = np.clip(xyxy[:, 0], 0, w); y1 = np.clip(xyxy[:, 1], 0, h)
+                        bw = np.minimum(xyxy[:, 2], w) - x1; bh = np.minimum(xyxy[:, 3], h) - y1
+                        keep = (bw > 10) & (bh > 10)
+                        bboxes.extend(zip(x1[keep].tolist(), y1[keep].tolist(), bw[keep].tolist(), bh[keep].tolist()))
             except Exception as e:
                 print(f"YOLO detection failed: {e}")
                 self.use_yolo = False
 
         if not bboxes:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if len(image.shape) == 3 else image
-            gray = cv2.equalizeHist(gray)
-            # Use cascade params if fornecidos
-            cp = self.cascade_params
-            scaleFactor = cp.get('scaleFactor', 1.1) if isinstance(cp, dict) else 1.1
-            minNeighbors = cp.get('minNeighbors', 4) if isinstance(cp, dict) else 4
-            minSize = tuple(cp.get('minSize', (30, 15))) if isinstance(cp, dict) else (30, 15)
-            maxSize = tuple(cp.get('maxSize', (400, 200))) if isinstance(cp, dict) else (400, 200)
-            plates = self.plate_cascade.detectMultiScale(gray, scaleFactor=scaleFactor, minNeighbors=minNeighbors, minSize=minSize, maxSize=maxSize)
+            # cinza + equalização (LUT) + cascade sobre o mesmo UMat; nenhum pixel volta para a CPU
+            # (as caixas saem como lista e as ROIs são recortadas do frame original)
+            if self.use_opencl:
+                src = cv2.UMat(image)
+                gray = cv2.cvtColor(src, cv2.COLOR_BGR2GRAY) if len(image.shape) == 3 else src
+            else:
+                gray = self._cinza(image)
+            gray = self._equalizar(gray)
+            plates = self.plate_cascade.detectMultiScale(gray, **self.cascade_params)
             for (x, y, w, h) in plates:
                 bboxes.append((int(x), int(y), int(w), int(h)))
 
         return bboxes
 
+    @staticmethod
+    def _best_reading(results):
+        """Escolhe a leitura de maior confiança do EasyOCR e normaliza texto e confiança."""
+        if not results:
+            return None
+        best = max(results, key=lambda r: r[2])
+        txt = best[1]
+        conf_raw = best[2]
+        try:
+            conf = float(conf_raw)
+            if conf > 1.0:
+                conf = conf / 100.0
+        except Exception:
+            conf = 0.0
+        return limpar_texto_placa(txt), float(conf)
+
     def recognize_text(self, plate_image: np.ndarray):
         if self.use_easyocr and self.reader:
             try:
-                results = self.reader.readtext(plate_image)
-                if results:
-                    best = max(results, key=lambda r: r[2])
-                    txt = best[1]
-                    conf_raw = best[2]
-                    try:
-                        conf = float(conf_raw)
-                        if conf > 1.0:
-                            conf = conf / 100.0
-                    except Exception:
-                        conf = 0.0
-                    return ''.join(filter(str.isalnum, txt)).upper(), float(conf)
+                reading = self._best_reading(self.reader.readtext(plate_image, allowlist=PLATE_ALLOWLIST))
+                if reading:
+                    return reading
             except Exception as e:
                 print(f"EasyOCR failed: {e}")
                 self.use_easyocr = False
@@ -163,17 +251,52 @@ class LPREngine:
         text, conf = self.fallback_ocr.extract_plate_text(plate_image)
         return text, conf
 
+    def recognize_text_batch(self, plate_images: list) -> list:
+        """
+        Reconhece várias ROIs (todas do mesmo tamanho) em uma única chamada ao EasyOCR,
+        dividindo o custo de montagem dos tensores e de inferência entre elas.
+        """
+        if self.use_easyocr and self.reader and len(plate_images) > 1:
+            try:
+                batch = self.reader.readtext_batched(plate_images, batch_size=len(plate_images),
+                                                     allowlist=PLATE_ALLOWLIST)
+                # ROI sem leitura vai direto ao fallback: o mesmo leitor já a processou no lote
+                return [self._best_reading(results) or self.fallback_ocr.extract_plate_text(img)
+                        for img, results in zip(plate_images, batch)]
+            except Exception as e:
+                print(f"EasyOCR em lote falhou: {e}")
+        return [self.recognize_text(img) for img in plate_images]
+
+    # Tamanho comum das ROIs (largura, altura, proporção ~3:1 da placa), necessário para o lote.
+    # Com 80 px de altura os caracteres ficam perto dos 64 px que o reconhecedor do EasyOCR usa;
+    # mais que isso só aumenta o custo do detector de texto (proporcional aos pixels).
+    OCR_ROI_SIZE = (240, 80)
+
     def extract_plate_from_image(self, image: np.ndarray):
         bboxes = self.detect_plate_bboxes(image)
-        best = (None, 0.0, None, None)
+        if not bboxes:
+            return (None, 0.0, None, None)
+        # Converte para cinza uma vez; cada ROI é recortada já em cinza e só redimensionada
+        gray = self._cinza(image)
+        # O lote do OCR é escrito em um único bloco (N, altura, largura), ampliado só quando faltam linhas
+        if len(self._roi_batch) < len(bboxes):
+            self._roi_batch = np.empty((len(bboxes),) + self._roi_batch.shape[1:], np.uint8)
+        kept, rois, batch = [], [], []
         for (x, y, w, h) in bboxes:
-            roi = image[y:y+h, x:x+w]
-            roi_gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY) if len(roi.shape) == 3 else roi
-            roi_resized = cv2.resize(roi_gray, (0,0), fx=2.0, fy=2.0, interpolation=cv2.INTER_CUBIC)
-            roi_eq = cv2.equalizeHist(roi_resized)
-            plate_text, conf = self.recognize_text(roi_eq)
+            interp = cv2.INTER_AREA if h > self.OCR_ROI_SIZE[1] else cv2.INTER_LINEAR
+            self._roi_tmp = cv2.resize(gray[y:y+h, x:x+w], self.OCR_ROI_SIZE, dst=self._roi_tmp,
+                                       interpolation=interp)
+            # Caixas sem nada que pareça texto ficam fora do lote do OCR
+            if not parece_ter_texto(self._roi_tmp):
+                continue
+            kept.append((x, y, w, h))
+            rois.append(image[y:y+h, x:x+w])
+            batch.append(self._clahe.apply(self._roi_tmp, dst=self._roi_batch[len(batch)]))
+
+        best = (None, 0.0, None, None)
+        for bbox, roi, (plate_text, conf) in zip(kept, rois, self.recognize_text_batch(batch)):
             if plate_text and conf > best[1]:
-                best = (plate_text, conf, (x,y,w,h), roi)
+                best = (plate_text, conf, bbox, roi)
         return best
 
 
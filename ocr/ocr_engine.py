@@ -4,89 +4,200 @@ e extrair texto de placas de veículos usando a biblioteca EasyOCR.
 '''
 
 import re
+import functools
+from typing import Optional, Tuple
+import cv2
 import easyocr
 import numpy as np
 
-# Padrões de placas (Mercosul e modelos anteriores)
-PLATE_PATTERNS = [
-    re.compile(r"^[A-Z]{3}[0-9][A-Z][0-9]{2}$"),  # Mercosul (ABC1D23)
-    re.compile(r"^[A-Z]{3}[0-9]{4}$"),              # Padrão antigo (ABC1234)
-]
+# Padrões de placas: Mercosul (ABC1D23) e modelo anterior (ABC1234), em uma única
+# expressão (os dois diferem só na 5ª posição: letra ou dígito)
+PLATE_RE = re.compile(r"^[A-Z]{3}[0-9][A-Z0-9][0-9]{2}$")
+
+# Letras que o OCR confunde com dígitos e a tabela que as corrige nas posições numéricas
+_DIGITOS_OCR = str.maketrans("IOSGZB", "105628")
+# Formatos aceitando essas letras nas posições de dígito (Mercosul LLLNLNN tem prioridade)
+_FORMATO_MERCOSUL = re.compile(r"[A-Z]{3}[0-9IOSGZB][A-Z][0-9IOSGZB]{2}")
+_FORMATO_ANTIGO = re.compile(r"[A-Z]{3}[0-9IOSGZB]{4}")
+
+# Únicos caracteres possíveis em uma placa: o decodificador do EasyOCR só considera estes
+PLATE_ALLOWLIST = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+
+# Tabelas para bytes.translate: minúsculas -> maiúsculas, e remoção de tudo que não é A-Z/0-9
+_ALFANUMERICOS = frozenset(b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789")
+_PARA_MAIUSCULAS = bytes.maketrans(b"abcdefghijklmnopqrstuvwxyz", b"ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+_REMOVER = bytes(c for c in range(256) if c not in _ALFANUMERICOS)
+
+
+def limpar_texto_placa(text: str) -> str:
+    '''
+    Mantém só letras/dígitos ASCII, em maiúsculas. Placas só usam A-Z e 0-9, então o
+    filtro e a conversão rodam em uma passada de bytes.translate (em C), sem laço Python.
+    '''
+    return text.encode("ascii", "ignore").translate(_PARA_MAIUSCULAS, _REMOVER).decode("ascii")
+
+
+# Filtro antes do OCR: fração mínima da classe minoritária após Otsu (caracteres escuros em
+# placa clara ou o contrário, como nas placas vermelhas) e desvio padrão mínimo do cinza
+MIN_INK_RATIO = 0.05
+MIN_ROI_STDDEV = 12.0
+
+
+def parece_ter_texto(gray: np.ndarray) -> bool:
+    '''
+    Verificação barata (uma binarização e uma contagem) de que a ROI em cinza pode conter
+    caracteres. ROIs lisas ou saturadas, típicas de falsos positivos do detector, são
+    descartadas sem chamar o EasyOCR.
+    '''
+    _, std = cv2.meanStdDev(gray)
+    if std[0, 0] < MIN_ROI_STDDEV:
+        return False
+    _, binaria = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    claros = cv2.countNonZero(binaria) / binaria.size
+    return min(claros, 1.0 - claros) >= MIN_INK_RATIO
+
+
+@functools.lru_cache(maxsize=1)
+def cuda_disponivel() -> bool:
+    '''Indica se há GPU CUDA utilizável pelo PyTorch (verificado uma vez por processo).'''
+    try:
+        import torch
+        return torch.cuda.is_available()
+    except Exception:
+        return False
+
+
+@functools.lru_cache(maxsize=None)
+def get_reader(languages: tuple, gpu: bool = False) -> easyocr.Reader:
+    '''
+    Retorna o leitor EasyOCR para os idiomas, criando-o só na primeira chamada.
+    Os pesos (~100 MB) são carregados uma vez por processo e compartilhados entre motores.
+    Na CPU, quantize=True converte as camadas Linear/LSTM do detector e do reconhecedor
+    para int8 (quantização dinâmica do PyTorch); na GPU não tem efeito. Na GPU, o
+    cudnn_benchmark escolhe o algoritmo de convolução mais rápido para as ROIs de tamanho fixo.
+    '''
+    return easyocr.Reader(list(languages), gpu=gpu, quantize=True, cudnn_benchmark=gpu)
+
 
 class OCREngine:
     '''Motor de OCR para reconhecimento de placas de veículos usando EasyOCR.'''
 
-    def __init__(self, languages=['pt']):
+    def __init__(self, languages=['pt'], gpu: Optional[bool] = None):
         '''
         Inicializa o leitor EasyOCR.
 
         Args:
             languages (list): Lista de idiomas para o EasyOCR. Padrão é ['pt'].
+            gpu (bool): Usar a GPU CUDA. Padrão (None): usa se estiver disponível.
         '''
+        if gpu is None:
+            gpu = cuda_disponivel()
         try:
-            print("Inicializando o motor EasyOCR (isso pode levar um tempo na primeira execução)...")
-            self.reader = easyocr.Reader(languages, gpu=False)  # gpu=False para compatibilidade
+            print(f"Inicializando o motor EasyOCR ({'GPU' if gpu else 'CPU'}; isso pode levar um tempo na primeira execução)...")
+            self.reader = get_reader(tuple(languages), gpu=gpu)
             print("✅ Motor EasyOCR inicializado com sucesso.")
         except Exception as e:
             print(f"❌ ERRO: Falha ao inicializar o EasyOCR. {e}")
             print("Por favor, certifique-se de que as dependências (PyTorch, EasyOCR) estão instaladas corretamente.")
             raise
+        # Confiança mínima para aceitar a leitura rápida (só reconhecedor) sem rodar o readtext
+        self.single_line_min_conf = 0.6
+
+    def warmup(self):
+        '''
+        Executa uma inferência em uma imagem vazia para que a primeira placa real
+        não pague a inicialização preguiçosa do PyTorch/EasyOCR.
+        '''
+        try:
+            self.reader.readtext(np.zeros((64, 256, 3), dtype=np.uint8))
+        except Exception as e:
+            print(f"⚠️  Aviso: warm-up do EasyOCR falhou: {e}")
 
     def normalize_by_position(self, text: str) -> str:
         '''
         Normaliza o texto da placa com base na posição dos caracteres,
         corrigindo erros comuns de OCR (ex: I -> 1, O -> 0).
         '''
-        mapping = { "I": "1", "O": "0", "S": "5", "G": "6", "Z": "2", "B": "8" }
-        
-        # Padrão Mercosul (LLLNLNN)
-        if len(text) == 7 and text[0:3].isalpha() and text[4].isalpha() and text[3].isdigit() and text[5:7].isdigit():
-            return "".join(
-                mapping.get(char, char) if i in [3, 5, 6] else char
-                for i, char in enumerate(text)
-            )
-        # Padrão antigo (LLLNNNN)
-        elif len(text) == 7 and text[0:3].isalpha() and text[3:7].isdigit():
-            return "".join(
-                mapping.get(char, char) if i >= 3 else char
-                for i, char in enumerate(text)
-            )
+        # Um fullmatch decide o formato; a tabela só é aplicada às fatias que devem ser dígitos
+        if _FORMATO_MERCOSUL.fullmatch(text):
+            return text[:3] + text[3].translate(_DIGITOS_OCR) + text[4] + text[5:].translate(_DIGITOS_OCR)
+        if _FORMATO_ANTIGO.fullmatch(text):
+            return text[:3] + text[3:].translate(_DIGITOS_OCR)
         return text
 
-    def extract_plate_info(self, image: np.ndarray):
+    def extract_plate_text(self, plate_image: np.ndarray) -> Tuple[str, float]:
         '''
-        Extrai o texto da placa de uma imagem, filtra e normaliza.
+        Lê o texto de uma ROI de placa já recortada (fallback do LPREngine).
+
+        Os trechos lidos são concatenados na ordem do EasyOCR (uma placa pode vir
+        quebrada em "ABC" e "1D23") em uma única passada, junto com as confianças.
 
         Args:
-            image (np.ndarray): Imagem (frame da câmera) para processar.
+            plate_image (np.ndarray): ROI da placa.
 
         Returns:
-            dict: Um dicionário com a placa, confiança e bounding box, ou None se nenhuma placa válida for encontrada.
+            tuple: (texto limpo em maiúsculas, confiança média entre 0 e 1), ou ("", 0.0).
         '''
         try:
-            results = self.reader.readtext(image)
+            results = self.reader.readtext(plate_image, allowlist=PLATE_ALLOWLIST)
         except Exception as e:
             print(f"❌ ERRO ao executar o readtext do EasyOCR: {e}")
-            return None
+            return "", 0.0
 
+        partes = []
+        confiancas = []
+        for (_, text, prob) in results:
+            if prob > 0 and text.strip():
+                partes.append(text)
+                confiancas.append(prob)
+        if not partes:
+            return "", 0.0
+        return limpar_texto_placa("".join(partes)), sum(confiancas) / len(confiancas)
+
+    def _melhor_placa(self, results):
+        '''
+        Escolhe, entre as leituras do EasyOCR, a de maior confiança que tem formato de placa.
+        '''
         best_match = None
         max_confidence = 0.0
 
         for (bbox, text, prob) in results:
-            cleaned_text = "".join(filter(str.isalnum, text)).upper()
-            normalized_text = self.normalize_by_position(cleaned_text)
-
-            for pattern in PLATE_PATTERNS:
-                if pattern.match(normalized_text):
-                    if prob > max_confidence:
-                        max_confidence = prob
-                        best_match = {
-                            "placa": normalized_text,
-                            "confianca": prob,
-                            "bbox": bbox
-                        }
-                        
+            # Comparação barata primeiro: leituras menos confiáveis nem são normalizadas
+            if prob <= max_confidence:
+                continue
+            normalized_text = self.normalize_by_position(limpar_texto_placa(text))
+
+            if PLATE_RE.match(normalized_text):
+                max_confidence = prob
+                best_match = {
+                    "placa": normalized_text,
+                    "confianca": prob,
+                    "bbox": bbox
+                }
+
         return best_match
 
+    def extract_plate_info(self, image: np.ndarray):
+        '''
+        Extrai o texto da placa de uma imagem, filtra e normaliza.
 
+        A imagem costuma ser a ROI da placa; por isso o reconhecedor roda primeiro sobre ela
+        inteira, como uma única linha, sem o detector de texto (a parte mais cara do readtext).
+        O readtext completo só é executado se essa leitura não for uma placa confiável.
+
+        Args:
+            image (np.ndarray): Imagem (ROI da placa ou frame da câmera) para processar.
+
+        Returns:
+            dict: Um dicionário com a placa, confiança e bounding box, ou None se nenhuma placa válida for encontrada.
+        '''
+        try:
+            rapida = self._melhor_placa(self.reader.recognize(image, allowlist=PLATE_ALLOWLIST))
+            if rapida and rapida["confianca"] >= self.single_line_min_conf:
+                return rapida
+            results = self.reader.readtext(image, allowlist=PLATE_ALLOWLIST)
+        except Exception as e:
+            print(f"❌ ERRO ao executar o readtext do EasyOCR: {e}")
+            return None
 
+        return self._melhor_placa(results)
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Validação em lote do formato de placas (Mercosul LLLNLNN e antigo LLLNNNN).
+
+As placas chegam como uma matriz uint8 (uma placa de até 8 bytes por linha, com
+zeros à direita). A normalização para maiúsculas e a checagem de formato rodam
+em um laço compilado com Numba; sem o Numba, a mesma regra é aplicada com
+operações vetorizadas do NumPy.
+
+Observação: o Numba é opcional. Instale 'numba' para usar o laço compilado.
+A compilação é persistida em cache (NUMBA_CACHE_DIR, se definido); para compilar
+antes do primeiro uso (ex.: no build da imagem), execute: python -m ocr.plate_format
+"""
+
+from typing import List, Tuple
+import numpy as np
+
+# Tentar importar o Numba (compilação JIT do laço de validação)
+try:
+    from numba import njit
+    _HAS_NUMBA = True
+except Exception:
+    _HAS_NUMBA = False
+
+PLATE_WIDTH = 8
+
+
+def _validar_placas_numpy(buf: np.ndarray) -> np.ndarray:
+    '''
+    Converte para maiúsculas (no próprio buffer) e retorna a máscara de placas válidas.
+    '''
+    minuscula = (buf >= 97) & (buf <= 122)
+    buf[minuscula] -= 32
+    letra = (buf >= 65) & (buf <= 90)
+    digito = (buf >= 48) & (buf <= 57)
+    return (letra[:, :3].all(axis=1) & digito[:, 3] & (letra[:, 4] | digito[:, 4])
+            & digito[:, 5:7].all(axis=1) & (buf[:, 7] == 0))
+
+
+if _HAS_NUMBA:
+    @njit(cache=True, nogil=True)
+    def _validar_placas_numba(buf):
+        n = buf.shape[0]
+        mask = np.zeros(n, dtype=np.bool_)
+        for i in range(n):
+            ok = buf[i, 7] == 0
+            for j in range(7):
+                c = buf[i, j]
+                if 97 <= c <= 122:
+                    c -= 32
+                    buf[i, j] = c
+                letra = 65 <= c <= 90
+                digito = 48 <= c <= 57
+                if j < 3:
+                    ok = ok and letra
+                elif j == 4:
+                    ok = ok and (letra or digito)
+                else:
+                    ok = ok and digito
+            mask[i] = ok
+        return mask
+
+
+def validar_placas(placas: List[bytes]) -> Tuple[List[str], List[bool]]:
+    '''
+    Normaliza e valida o formato de uma lista de placas.
+
+    Args:
+        placas (list): Placas em bytes ASCII, já sem espaços (ex.: b"abc1d23").
+
+    Returns:
+        tuple: (placas em maiúsculas, máscara indicando quais têm formato válido).
+    '''
+    if not placas:
+        return [], []
+    # 'S8' corta em 8 bytes; uma placa mais longa fica com o 8º byte preenchido e é rejeitada
+    buf = np.array(placas, dtype=f'S{PLATE_WIDTH}').view(np.uint8).reshape(-1, PLATE_WIDTH)
+    mask = _validar_placas_numba(buf) if _HAS_NUMBA else _validar_placas_numpy(buf)
+    normalizadas = buf.view(f'S{PLATE_WIDTH}').ravel()
+    return [p.decode('ascii', 'replace') for p in normalizadas], mask.tolist()
+
+
+def warmup():
+    '''
+    Compila (ou carrega do cache) o laço Numba com uma entrada mínima, para que a
+    primeira requisição real não pague a compilação JIT.
+    '''
+    if not _HAS_NUMBA:
+        return
+    try:
+        _validar_placas_numba(np.zeros((1, PLATE_WIDTH), dtype=np.uint8))
+    except Exception as e:
+        print(f"⚠️  Aviso: warm-up do Numba falhou: {e}")
+
+
+if __name__ == "__main__":
+    warmup()
+    print('plate_format: warm-up concluído. Numba:', _HAS_NUMBA)